@@ -0,0 +1,76 @@
+import argparse
+import random
+import time
+
+from extract_large_subgraphs import extract_large_subgraphs
+
+# idiom_graph.json 的规模
+BASE_NODES = 8833
+BASE_EDGES = 27799
+
+def make_synthetic_graph(scale, seed=42):
+    """
+    生成约 scale 倍于 idiom_graph.json 的合成图：
+    大量小簇（簇内边权重较高）+ 跨簇的高权重边（把簇并成更大的分量）
+    + 重复边（同一端点对的正反向重复记录）+ 随机的低权重噪声边
+    """
+    rng = random.Random(seed)
+    n_nodes = BASE_NODES * scale
+    n_edges = BASE_EDGES * scale
+    nodes = [{"id": f"词{i}"} for i in range(n_nodes)]
+
+    def edge(a, b, weight):
+        return {"source": f"词{a}", "target": f"词{b}", "weight": weight, "questions": [a]}
+
+    edges = []
+    clusters = []
+    i = 0
+    while i < n_nodes:
+        cluster_size = rng.choice([2, 3, 4, 5, 8, 12, 20, 40])
+        cluster = range(i, min(i + cluster_size, n_nodes))
+        clusters.append(cluster)
+        for a, b in zip(cluster, cluster[1:]):
+            edges.append(edge(a, b, rng.randint(3, 8)))
+        i += cluster_size
+
+    # 跨簇边：权重不低于阈值，参与并查集合并；数量低于簇数的一半，不会连成一个巨型分量
+    for _ in range(len(clusters) * 2 // 5):
+        a, b = rng.sample(clusters, 2)
+        edges.append(edge(rng.choice(a), rng.choice(b), rng.randint(3, 8)))
+
+    # 重复边：约 10% 的已有边以正向或反向再出现一次，需要去重
+    for e in rng.sample(edges, len(edges) // 10):
+        if rng.random() < 0.5:
+            edges.append(dict(e))
+        else:
+            edges.append(dict(e, source=e["target"], target=e["source"]))
+
+    while len(edges) < n_edges:
+        a, b = rng.randrange(n_nodes), rng.randrange(n_nodes)
+        edges.append({"source": f"词{a}", "target": f"词{b}", "weight": 1, "questions": []})
+
+    rng.shuffle(edges)
+    return nodes, edges
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_large_subgraphs 规模扩展基准")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--min-size", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'规模':>6} {'节点数':>10} {'边数':>10} {'子图数':>8} {'最大子图':>8} {'耗时(s)':>10} {'每边(μs)':>10}")
+    per_edge = []
+    for scale in args.scales:
+        nodes, edges = make_synthetic_graph(scale)
+        start = time.perf_counter()
+        subgraphs = extract_large_subgraphs(nodes, edges, min_weight=3, min_size=args.min_size)
+        elapsed = time.perf_counter() - start
+        per_edge.append(elapsed / len(edges) * 1e6)
+        print(f"{scale:>6} {len(nodes):>10} {len(edges):>10} {len(subgraphs):>8} "
+              f"{max((len(s['nodes']) for s in subgraphs), default=0):>8} {elapsed:>10.3f} {per_edge[-1]:>10.3f}")
+
+    # 线性扩展时每条边的耗时应基本不变；去重等排序步骤为 O(E log E)，规模增大时会缓慢上升
+    print(f"最大/最小 每边耗时比: {max(per_edge) / min(per_edge):.2f}")
+
+if __name__ == "__main__":
+    main()
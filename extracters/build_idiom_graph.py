@@ -0,0 +1,213 @@
+import argparse
+import json
+import re
+
+import numpy as np
+import scipy.sparse as sp
+
+from extract_components import (
+    SIZE_BUCKETS, LARGE_MAX_SIZE, extract_all_buckets, save_to_json, component_id, build_subgraph_index,
+    assign_subgraph_files, remove_stale_subgraphs, save_subgraph_index, load_subgraph_index
+)
+
+# 选项前缀，如 "A." "B、" "C：" "D "
+OPTION_LABEL = re.compile(r'^\s*[A-Da-d][\.．、:：\s]\s*')
+# 选项内多个词语之间的分隔符
+WORD_SEPARATOR = re.compile(r'[\s、，,；;／/|]+')
+# 候选词语：两个及以上汉字
+CANDIDATE = re.compile(r'^[\u4e00-\u9fa5]{2,}$')
+
+def extract_candidate_idioms(question):
+    """从题目选项中提取候选词语（去重，保持出现顺序）"""
+    words = []
+    seen = set()
+    for option in question.get('options', []):
+        option = OPTION_LABEL.sub('', option)
+        for word in WORD_SEPARATOR.split(option):
+            if CANDIDATE.match(word) and word not in seen:
+                words.append(word)
+                seen.add(word)
+    return words
+
+def build_incidence_matrix(questions):
+    """
+    构建 题目 x 词语 的 0/1 稀疏关联矩阵。
+    返回 (matrix, question_ids, idiom_ids)，行/列顺序为首次出现顺序
+    """
+    idiom_index = {}
+    idiom_ids = []
+    question_ids = []
+    rows = []
+    cols = []
+    for qid, question in questions.items():
+        row = len(question_ids)
+        question_ids.append(qid)
+        for word in extract_candidate_idioms(question):
+            if word not in idiom_index:
+                idiom_index[word] = len(idiom_ids)
+                idiom_ids.append(word)
+            rows.append(row)
+            cols.append(idiom_index[word])
+
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(question_ids), len(idiom_ids))
+    )
+    return matrix, question_ids, idiom_ids
+
+def cooccurrence_edges(matrix, question_ids, idiom_ids):
+    """
+    共现权重 = M^T M 的上三角（不含对角线）；
+    每条边的共考题目 = 两列非零行号的交集
+    """
+    cooc = sp.triu(matrix.T @ matrix, k=1).tocoo()
+    order = np.lexsort((cooc.col, cooc.row))
+
+    by_idiom = matrix.tocsc()
+    by_idiom.sort_indices()
+
+    def rows_of(j):
+        return by_idiom.indices[by_idiom.indptr[j]:by_idiom.indptr[j + 1]]
+
+    edges = []
+    for i, j, weight in zip(cooc.row[order].tolist(), cooc.col[order].tolist(), cooc.data[order].tolist()):
+        shared = np.intersect1d(rows_of(i), rows_of(j), assume_unique=True)
+        edges.append({
+            "source": idiom_ids[i],
+            "target": idiom_ids[j],
+            "weight": weight,
+            "questions": [question_ids[k] for k in shared.tolist()]
+        })
+    return edges
+
+def build_graph(questions, lexicon=None):
+    """由题库构建 idiom_graph.json 的 nodes / edges 结构"""
+    matrix, question_ids, idiom_ids = build_incidence_matrix(questions)
+    lexicon = lexicon or {}
+
+    nodes = []
+    for idiom in idiom_ids:
+        node = {"id": idiom}
+        node.update(lexicon.get(idiom, {}))
+        nodes.append(node)
+
+    return {"nodes": nodes, "edges": cooccurrence_edges(matrix, question_ids, idiom_ids)}
+
+def update_graph(graph, new_questions, lexicon=None):
+    """
+    将新增题目合并进已有共现图（原地修改）：新词语追加为节点，
+    已有边累加权重并追加共考题目，新边追加到末尾。
+    返回受影响的词语集合。已出现在边上的题号会被跳过，重复执行不会重复计数。
+    """
+    known = {qid for edge in graph['edges'] for qid in edge.get('questions', [])}
+    addition = build_graph(
+        {qid: q for qid, q in new_questions.items() if qid not in known}, lexicon
+    )
+
+    touched = set()
+    node_ids = {node['id'] for node in graph['nodes']}
+    for node in addition['nodes']:
+        if node['id'] not in node_ids:
+            graph['nodes'].append(node)
+            node_ids.add(node['id'])
+            touched.add(node['id'])
+
+    edge_index = {}
+    for edge in graph['edges']:
+        u, v = edge['source'], edge['target']
+        edge_index.setdefault((u, v) if u < v else (v, u), edge)
+    for edge in addition['edges']:
+        u, v = edge['source'], edge['target']
+        key = (u, v) if u < v else (v, u)
+        existing = edge_index.get(key)
+        if existing is None:
+            graph['edges'].append(edge)
+            edge_index[key] = edge
+        else:
+            existing['weight'] = existing.get('weight', 0) + edge['weight']
+            existing['questions'] = existing.get('questions', []) + edge['questions']
+        touched.update(key)
+
+    return touched
+
+def output_node_sets(graph, min_weight=3, min_size=10):
+    """各分组文件（idioms_*.json）包含的词语集合；大子图以分量 id 区分，不在此列出"""
+    bucket_results, _ = extract_all_buckets(
+        graph['nodes'], graph['edges'], min_weight=min_weight, min_size=min_size
+    )
+    return {
+        output_file: {node['id'] for node in bucket_results[name]['nodes']}
+        for name, (_, _, output_file) in SIZE_BUCKETS.items()
+    }
+
+def emit_changed_outputs(graph, before, touched, min_weight=3, min_size=10, max_size=LARGE_MAX_SIZE,
+                         index_file='large_subgraphs_index.json'):
+    """
+    只重写成员发生变化、或包含受影响词语的输出文件。
+    大子图按分量 id（由成员决定）与上次的分量索引比较：已有分量沿用原文件名，
+    新分量使用空闲编号，不再存在的分量文件会被删除。
+    超过 max_size 的分量与 extract_components.py 一样按社区拆分
+    """
+    bucket_results, large_subgraphs = extract_all_buckets(
+        graph['nodes'], graph['edges'], min_weight=min_weight, min_size=min_size, max_size=max_size
+    )
+    written = []
+    for name, (_, _, output_file) in SIZE_BUCKETS.items():
+        data = bucket_results[name]
+        members = {node['id'] for node in data['nodes']}
+        if members != before.get(output_file) or members & touched:
+            save_to_json(data, output_file)
+            written.append(output_file)
+
+    previous = load_subgraph_index(index_file)
+    component_ids = [component_id(node['id'] for node in data['nodes']) for data in large_subgraphs]
+    output_files = assign_subgraph_files(component_ids, previous)
+    for cid, output_file, data in zip(component_ids, output_files, large_subgraphs):
+        if cid not in previous or {node['id'] for node in data['nodes']} & touched:
+            save_to_json(data, output_file)
+            written.append(output_file)
+
+    remove_stale_subgraphs(previous, output_files)
+
+    save_subgraph_index(build_subgraph_index(large_subgraphs, output_files=output_files), index_file)
+    print(f"共 {len(SIZE_BUCKETS) + len(large_subgraphs)} 个分组文件，重写 {len(written)} 个")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="由 merged_questions.json 构建词语共现图")
+    parser.add_argument("--questions", default="merged_questions.json")
+    parser.add_argument("--lexicon", default=None,
+                        help="可选的词典 JSON：{词语: {explanation, similar, opposite}}")
+    parser.add_argument("--output", default="idiom_graph.json")
+    parser.add_argument("--update", action="store_true",
+                        help="增量模式：--questions 只包含新增题目，合并进已有的 --output 并只重写变化的分组文件")
+    parser.add_argument("--min-weight", type=int, default=3)
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=LARGE_MAX_SIZE,
+                        help="单个大子图的最大节点数，超过则按社区拆分")
+    args = parser.parse_args()
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    lexicon = None
+    if args.lexicon:
+        with open(args.lexicon, 'r', encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+    if args.update:
+        with open(args.output, 'r', encoding='utf-8') as f:
+            graph = json.load(f)
+        before = output_node_sets(graph, args.min_weight, args.min_size)
+        touched = update_graph(graph, questions, lexicon)
+    else:
+        graph = build_graph(questions, lexicon)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(graph, f, ensure_ascii=False, indent=2)
+    print(f"共现图已保存到 {args.output}（{len(graph['nodes'])} 个节点, {len(graph['edges'])} 条边）")
+
+    if args.update:
+        emit_changed_outputs(graph, before, touched, args.min_weight, args.min_size, args.max_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+from compact_graph import CompactGraph
+from extract_components import extract_all_buckets, load_graph_data
+from generate_knowledge_graph import build_search_index
+from keyword_matcher import KeywordMatcher
+from topic_classifier import EightDimensionClassifier
+
+# 合成文本用的填充片段：常见虚词、标点、数字与空白，制造关键词前后缀重叠与分词边界
+FILLERS = ["的", "了", "和", "在", "是", "不断", "我们", "进一步", "，", "。", "、", "（ ）", " ", "  ",
+           "A.", "12", "abc", "\n", "——", "“", "”"]
+
+def brute_force_find(keywords, text):
+    """逐个关键词做子串判断"""
+    return {keyword for keyword in keywords if keyword and keyword in text}
+
+def random_text(rng, vocabulary, max_pieces=12):
+    """由关键词、关键词片段与填充片段随机拼成的文本"""
+    pieces = []
+    for _ in range(rng.randint(0, max_pieces)):
+        roll = rng.random()
+        word = rng.choice(vocabulary)
+        if roll < 0.45:
+            pieces.append(word)
+        elif roll < 0.7:
+            start = rng.randrange(len(word))
+            pieces.append(word[start:rng.randint(start + 1, len(word))])
+        else:
+            pieces.append(rng.choice(FILLERS))
+    return ''.join(pieces)
+
+def check_keyword_matcher(rng, n_texts):
+    """KeywordMatcher.find_all 与逐词子串判断一致（小字母表上的重叠关键词 + 分类器词表）"""
+    failures = []
+    for _ in range(n_texts):
+        keywords = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 12))]
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 30)))
+        if KeywordMatcher(keywords).find_all(text) != brute_force_find(keywords, text):
+            failures.append((keywords, text))
+
+    classifier = EightDimensionClassifier(keyword_only=True)
+    vocabulary = classifier.matcher.keywords
+    for _ in range(n_texts):
+        text = random_text(rng, vocabulary)
+        if classifier.matcher.find_all(text) != brute_force_find(vocabulary, text):
+            failures.append(("分类器词表", text))
+    return failures
+
+def reference_classification(classifier, data):
+    """原实现的关键词分类：逐维度逐关键词子串判断，题干 + 选项整体分词"""
+    text = data['text']
+    options_text = ' '.join(data['options'])
+    combined_text = text + " " + options_text
+
+    scores = {dimension: 0 for dimension in classifier.core_dimensions}
+    for word in classifier.tokenize(combined_text):
+        for dimension, info in classifier.core_dimensions.items():
+            if word in info['keywords'] and len(word) > 1:
+                scores[dimension] += 1
+    for dimension, info in classifier.core_dimensions.items():
+        for keyword in info['keywords']:
+            if keyword in combined_text:
+                scores[dimension] += 0.5
+
+    max_score = max(scores.values())
+    if max_score > 0:
+        best_dimension = [dim for dim, score in scores.items() if score == max_score][0]
+        sub_themes = classifier.core_dimensions[best_dimension]['sub_themes']
+        theme_scores = {theme: 0 for theme in sub_themes}
+        for theme in sub_themes:
+            for keyword in classifier.sub_theme_keywords[best_dimension][theme]:
+                if keyword in combined_text:
+                    theme_scores[theme] += 1
+        best_theme = max(theme_scores.values())
+        sub_theme = ([theme for theme, score in theme_scores.items() if score == best_theme][0]
+                     if best_theme > 0 else sub_themes[0])
+        result = {'main_dimension': best_dimension, 'sub_theme': sub_theme,
+                  'confidence': min(max_score / 5, 1.0), 'dimension_scores': scores}
+    else:
+        result = {'main_dimension': '其他', 'sub_theme': '未分类', 'confidence': 0.0, 'dimension_scores': scores}
+
+    result['keywords'] = list(dict.fromkeys(
+        word for word in classifier.tokenize(text)
+        for dimension, info in classifier.core_dimensions.items()
+        if word in info['keywords'] and len(word) > 1
+    ))
+    return result
+
+def random_questions(rng, vocabulary, n_questions):
+    """关键词密集的合成题目"""
+    return {
+        str(i): {
+            "text": random_text(rng, vocabulary, 20),
+            "options": [f"{label}.{random_text(rng, vocabulary, 4)}" for label in "ABCD"],
+        }
+        for i in range(n_questions)
+    }
+
+def check_classification(rng, n_questions, questions_file=None):
+    """classify_question（题干、选项分别分词后拼接）与原实现逐题一致"""
+    classifier = EightDimensionClassifier(keyword_only=True)
+    questions = random_questions(rng, classifier.matcher.keywords, n_questions)
+    if questions_file and os.path.exists(questions_file):
+        with open(questions_file, 'r', encoding='utf-8') as f:
+            questions.update({f"file-{qid}": data for qid, data in json.load(f).items()})
+
+    failures = []
+    for qid, data in questions.items():
+        if classifier.classify_question(data) != reference_classification(classifier, data):
+            failures.append((qid, data))
+    return failures, len(questions)
+
+def check_pooled_classification(rng, n_questions, workers=2):
+    """
+    进程池分批分类与单进程结果一致；分类器使用改动过的词表，
+    以确认子进程沿用实例的维度与子主题词表而不是默认词表
+    """
+    classifier = EightDimensionClassifier(keyword_only=True)
+    dimension = next(iter(classifier.core_dimensions))
+    theme = classifier.core_dimensions[dimension]['sub_themes'][-1]
+    classifier.core_dimensions[dimension]['keywords'].append("自定义关键词")
+    classifier.sub_theme_keywords[dimension][theme].append("自定义关键词")
+    classifier.build_keyword_index()
+
+    questions = random_questions(rng, classifier.matcher.keywords, n_questions)
+    inline = {qid: classifier.classify_question(data) for qid, data in questions.items()}
+    pooled = classifier.classify_questions(questions, workers=workers, batch_size=max(1, n_questions // 4))
+    return [(qid, data) for qid, data in questions.items() if pooled.get(qid) != inline[qid]]
+
+def detail_fields(node):
+    """搜索第二级匹配的字段：解释与近义/反义词"""
+    return [node.get("explanation") or ""] + list(node.get("similar") or []) + list(node.get("opposite") or [])
+
+def brute_force_search(nodes, initials, keyword):
+    """页面搜索的期望结果：先匹配词语/拼音首字母，无结果再匹配解释与近反义词"""
+    def hits(fields_of):
+        return [i for i, node in enumerate(nodes) if any(keyword in field.lower() for field in fields_of(i, node))]
+    found = hits(lambda i, node: [node["id"], initials[i]])
+    if found:
+        return found
+    return hits(lambda i, node: detail_fields(node))
+
+def indexed_search(index, nodes, keyword):
+    """与页面中 lookup() 相同的查找：n-gram 倒排表求交后核对子串"""
+    def lookup(postings, fields_of):
+        grams = [keyword] if len(keyword) == 1 else [keyword[i:i + 2] for i in range(len(keyword) - 1)]
+        candidates = None
+        for gram in grams:
+            postings_list = postings.get(gram, [])
+            if postings_list != sorted(postings_list):
+                raise AssertionError(f"倒排表未按升序排列: {gram!r}")
+            candidates = postings_list if candidates is None else [i for i in candidates if i in set(postings_list)]
+        return [i for i in candidates if any(keyword in field.lower() for field in fields_of(i, nodes[i]))]
+    found = lookup(index["name"], lambda i, node: [node["id"], index["initials"][i]])
+    if found:
+        return found
+    return lookup(index["text"], lambda i, node: detail_fields(node))
+
+def check_search_index(rng, n_queries, patterns=("large_subgraph_*.json", "idioms_*.json")):
+    """
+    build_search_index 的倒排表不漏召回：索引查找与逐节点子串扫描结果一致。
+    使用带解释与近反义词的子图文件，查询词取自词语、拼音首字母与解释/近反义词；
+    返回 (不一致的查询, 查询数, 落到解释索引的查询数)，没有可用文件时返回 None
+    """
+    files = sorted(set().union(*(glob.glob(pattern) for pattern in patterns)))
+    graphs = []
+    for graph_file in files:
+        with open(graph_file, 'r', encoding='utf-8') as f:
+            nodes = json.load(f)["nodes"]
+        if nodes:
+            graphs.append((nodes, build_search_index(nodes)))
+    if not graphs:
+        return None
+
+    failures, text_queries = [], 0
+    for _ in range(n_queries):
+        nodes, index = rng.choice(graphs)
+        i = rng.randrange(len(nodes))
+        source = rng.choice([nodes[i]["id"], index["initials"][i] or nodes[i]["id"]]
+                            + [field for field in detail_fields(nodes[i]) if field] * 2)
+        start = rng.randrange(len(source))
+        keyword = source[start:start + rng.randint(1, 4)].lower().strip()
+        if not keyword:
+            continue
+        expected = brute_force_search(nodes, index["initials"], keyword)
+        if indexed_search(index, nodes, keyword) != expected:
+            failures.append(keyword)
+        if expected and not any(keyword in field.lower() for field in [nodes[expected[0]]["id"], index["initials"][expected[0]]]):
+            text_queries += 1
+    return failures, n_queries, text_queries
+
+def is_connected(subgraph):
+    ids = [node["id"] for node in subgraph["nodes"]]
+    adjacency = {node_id: set() for node_id in ids}
+    for edge in subgraph["edges"]:
+        adjacency[edge["source"]].add(edge["target"])
+        adjacency[edge["target"]].add(edge["source"])
+    seen, stack = {ids[0]}, [ids[0]]
+    while stack:
+        for other in adjacency[stack.pop()] - seen:
+            seen.add(other)
+            stack.append(other)
+    return len(seen) == len(ids)
+
+def check_split_coverage(graph_file, min_weight=1, max_sizes=(150, 40, 12)):
+    """
+    超限分量拆分后不丢节点：分量中的每个节点至少出现在一个大子图中，且每个大子图连通；
+    返回 (问题列表, 检查的超限节点数)，图文件不存在时返回 None
+    """
+    if not os.path.exists(graph_file):
+        return None
+    nodes, edges = load_graph_data(graph_file)
+    graph = CompactGraph.from_json(nodes, edges)
+    labels = graph.component_labels(min_weight)
+    sizes = np.bincount(labels, minlength=graph.num_nodes)
+
+    failures, total = [], 0
+    for max_size in max_sizes:
+        oversized = {graph.nodes[i]["id"] for i in np.flatnonzero(sizes[labels] > max_size).tolist()}
+        _, large_subgraphs = extract_all_buckets(nodes, edges, min_weight=min_weight, graph=graph,
+                                                 labels=labels, max_size=max_size)
+        covered = {node["id"] for subgraph in large_subgraphs for node in subgraph["nodes"]}
+        failures.extend((max_size, "未输出", node_id) for node_id in sorted(oversized - covered))
+        failures.extend((max_size, "不连通", subgraph["nodes"][0]["id"])
+                        for subgraph in large_subgraphs if not is_connected(subgraph))
+        total += len(oversized)
+    return failures, total
+
+def report(name, failures, total):
+    if failures:
+        print(f"✗ {name}: {len(failures)}/{total} 例不一致，例如 {failures[0]!r}")
+    else:
+        print(f"✓ {name}: {total} 例一致")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词自动机、分类打分、进程池分类、搜索索引与分量拆分的回归检查")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--texts", type=int, default=3000, help="自动机检查的随机文本数")
+    parser.add_argument("--questions", type=int, default=500, help="分类检查的合成题目数")
+    parser.add_argument("--questions-file", default="merged_questions.json",
+                        help="若存在，其中的题目也参与分类检查")
+    parser.add_argument("--queries", type=int, default=500, help="搜索索引检查的查询数")
+    parser.add_argument("--graph", default="idiom_graph.json", help="拆分覆盖检查使用的图数据（最小权重 1）")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ok = report("KeywordMatcher 与逐词子串判断", check_keyword_matcher(rng, args.texts), 2 * args.texts)
+    failures, total = check_classification(rng, args.questions, args.questions_file)
+    ok &= report("classify_question 与原实现", failures, total)
+    ok &= report("进程池分类与单进程", check_pooled_classification(rng, args.questions), args.questions)
+    result = check_search_index(rng, args.queries)
+    if result is None:
+        print("- 未找到 large_subgraph_*.json / idioms_*.json，跳过搜索索引检查")
+    else:
+        failures, total, text_queries = result
+        ok &= report(f"搜索索引与逐节点扫描（{text_queries} 例走解释/近反义词索引）", failures, total)
+    result = check_split_coverage(args.graph)
+    if result is None:
+        print(f"- 未找到 {args.graph}，跳过拆分覆盖检查")
+    else:
+        ok &= report("超限分量拆分后节点全部输出且各块连通", *result)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
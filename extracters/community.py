@@ -0,0 +1,194 @@
+import numpy as np
+
+from compact_graph import connected_component_labels
+
+def label_propagation(num_nodes, src, dst, weight, max_iter=50, seed=42):
+    """
+    加权标签传播（数组化）：每轮每个节点取邻居中权重和最大的标签。
+    每轮只随机更新一半节点，避免同步更新在二部结构上来回振荡；
+    随机扰动打破平局，固定 seed 保证结果可复现。
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.arange(num_nodes, dtype=np.int64)
+    if len(src) == 0:
+        return labels
+
+    heads = np.concatenate([src, dst]).astype(np.int64)
+    tails = np.concatenate([dst, src]).astype(np.int64)
+    weights = np.concatenate([weight, weight]).astype(np.float64)
+
+    for _ in range(max_iter):
+        # (节点, 邻居标签) -> 权重和
+        keys, inverse = np.unique(heads * num_nodes + labels[tails], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        scores += rng.random(len(scores)) * 1e-6
+        owners = keys // num_nodes
+        candidates = keys % num_nodes
+
+        # 每个节点得分最高的标签
+        order = np.lexsort((-scores, owners))
+        first = order[np.r_[True, owners[order][1:] != owners[order][:-1]]]
+        best = labels.copy()
+        best[owners[first]] = candidates[first]
+
+        if np.array_equal(best, labels):
+            break
+        update = rng.random(num_nodes) < 0.5
+        labels = np.where(update, best, labels)
+
+    return labels
+
+def _connected_chunks(members, src, dst, max_size):
+    """
+    兜底：把一个连通的社区切成连通的块，每块不超过 max_size 个节点。
+    以度数最大的节点为根建 BFS 树，自底向上打包子树：某节点放不下其余子树时，
+    已打包的子树单独成块，并带上该节点的副本作为锚点，使块保持连通
+    （星形结构即中心节点被复制到每一块）。
+    返回 [(块内节点, 锚点或 None)]，锚点不计入该块的成员
+    """
+    member_set = set(members)
+    adjacency = {node: [] for node in members}
+    for u, v in zip(src.tolist(), dst.tolist()):
+        if u in member_set and v in member_set:
+            adjacency[u].append(v)
+            adjacency[v].append(u)
+
+    chunks = []
+    seen = set()
+    for start in sorted(members, key=lambda node: (-len(adjacency[node]), node)):
+        if start in seen:
+            continue
+        seen.add(start)
+        order = [start]
+        children = {}
+        for node in order:
+            children[node] = [neighbor for neighbor in adjacency[node] if neighbor not in seen]
+            seen.update(children[node])
+            order.extend(children[node])
+
+        # 自底向上：pending[node] 为 node 所在、尚未成块的子树部分（含 node，少于 max_size 个节点）
+        pending = {}
+        for node in reversed(order):
+            current = [node]
+            for child in children[node]:
+                piece = pending.pop(child, [])
+                if len(current) + len(piece) > max_size:
+                    if len(current) > 1:
+                        chunks.append((current[1:], node))
+                    current = [node]
+                current.extend(piece)
+            if len(current) >= max_size or node == start:
+                chunks.append((current, None))
+            else:
+                pending[node] = current
+
+    return chunks
+
+def _merge_small(labels, src, dst, weight, scope, min_size, max_size):
+    """
+    把 scope 内节点数 <= min_size 的小社区并入连接权重最大的相邻社区，
+    合并后不超过 max_size；只沿边合并，结果仍连通
+    """
+    n = len(labels)
+    cross = scope[src] & (labels[src] != labels[dst])
+    a = np.concatenate([labels[src[cross]], labels[dst[cross]]])
+    b = np.concatenate([labels[dst[cross]], labels[src[cross]]])
+    keys, inverse = np.unique(a * n + b, return_inverse=True)
+    pair_weight = np.bincount(inverse, weights=np.concatenate([weight[cross], weight[cross]]))
+
+    neighbors = {}
+    for key, w in zip(keys.tolist(), pair_weight.tolist()):
+        neighbors.setdefault(key // n, []).append((key % n, w))
+
+    sizes = np.bincount(labels, minlength=n)
+    size = {root: int(sizes[root]) for root in np.unique(labels[scope]).tolist()}
+    parent = {root: root for root in size}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for root in sorted(size, key=lambda r: size[r]):
+        root = find(root)
+        if size[root] > min_size:
+            continue
+        totals = {}
+        for other, w in neighbors.get(root, []):
+            other = find(other)
+            if other != root:
+                totals[other] = totals.get(other, 0) + w
+        candidates = [o for o in totals if size[o] + size[root] <= max_size]
+        if not candidates:
+            continue
+        target = max(candidates, key=lambda o: (totals[o], -o))
+        parent[root] = target
+        size[target] += size[root]
+        neighbors.setdefault(target, []).extend(neighbors.pop(root, []))
+
+    merged = labels.copy()
+    members = np.flatnonzero(scope)
+    merged[members] = [find(r) for r in labels[members].tolist()]
+    # 重新规范为组内最小节点下标
+    smallest = np.full(n, n, dtype=np.int64)
+    np.minimum.at(smallest, merged, np.arange(n))
+    return smallest[merged]
+
+def split_oversized(graph, labels, min_weight, max_size, min_size=None, max_rounds=10):
+    """
+    将节点数超过 max_size 的连通分量按社区拆分：
+    在超限分量内部做标签传播，再按“同标签且连通”拆成子社区；
+    仍超限的社区进入下一轮。给定 min_size 时，拆出的小社区（<= min_size）
+    会并入相邻社区。最终仍超限的社区按 BFS 树切成连通的块；
+    无处可并的单节点社区以连接最强的邻居为锚点，不会被丢弃。
+    返回 (labels, anchors)：labels 含义与 component_labels 相同（组内最小节点下标），
+    anchors 为 {块的标号: 锚点节点下标}，锚点需额外复制到该块中。
+    """
+    n = graph.num_nodes
+    edge_ids = graph.unique_edge_ids(min_weight)
+    src, dst = graph.src[edge_ids], graph.dst[edge_ids]
+    weight = graph.weight[edge_ids]
+    labels = np.asarray(labels, dtype=np.int64)
+    scope = np.bincount(labels, minlength=n)[labels] > max_size
+
+    for _ in range(max_rounds):
+        oversized = np.bincount(labels, minlength=n)[labels] > max_size
+        if not oversized.any():
+            break
+        inside = oversized[src] & (labels[src] == labels[dst])
+        propagated = label_propagation(n, src[inside], dst[inside], weight[inside])
+        refined = np.where(oversized, propagated, labels)
+        same = refined[src] == refined[dst]
+        split = connected_component_labels(n, src[same], dst[same])
+        if np.array_equal(split, labels):
+            break
+        labels = split
+
+    if min_size is not None:
+        labels = _merge_small(labels, src, dst, weight, scope, min_size, max_size)
+
+    anchors = {}
+    sizes = np.bincount(labels, minlength=n)
+    for root in np.flatnonzero(sizes > max_size).tolist():
+        members = np.flatnonzero(labels == root).tolist()
+        for chunk, anchor in _connected_chunks(members, src, dst, max_size):
+            labels[chunk] = min(chunk)
+            if anchor is not None:
+                anchors[min(chunk)] = anchor
+
+    # 无法合并、也不是切块产生的单节点社区：以连接权重最大的邻居为锚点，保证每个节点都被输出
+    lonely = scope & (np.bincount(labels, minlength=n)[labels] == 1)
+    lonely[list(anchors)] = False
+    if lonely.any():
+        node = np.concatenate([src, dst])
+        other = np.concatenate([dst, src])
+        w = np.concatenate([weight, weight])
+        keep = lonely[node]
+        node, other, w = node[keep], other[keep], w[keep]
+        order = np.lexsort((other, -w, node))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = node[order][1:] != node[order][:-1]
+        for i, anchor in zip(node[order][first].tolist(), other[order][first].tolist()):
+            anchors[i] = anchor
+    return labels, anchors
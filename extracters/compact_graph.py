@@ -0,0 +1,194 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+class CompactGraph:
+    """
+    整数化的图表示：节点 id 只做一次字符串 -> 连续整数的映射，
+    边存为 NumPy 数组 (src, dst, weight)，并附带 CSR 邻接表。
+    nodes / edges 保留原始字典，仅在输出节点、边记录时使用。
+    """
+
+    def __init__(self, node_ids, src, dst, weight, nodes=None, edges=None):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.weight = np.asarray(weight)
+        self.nodes = nodes
+        self.edges = edges
+        self._csr = None
+
+    @classmethod
+    def from_json(cls, nodes, edges):
+        """由 idiom_graph.json 的 nodes / edges 列表构建"""
+        # 由二进制缓存加载的记录已自带整数化图，直接复用
+        if isinstance(edges, LazyRecords) and edges.graph is not None:
+            return edges.graph
+        node_ids = [node['id'] for node in nodes]
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        src = np.fromiter((index[e['source']] for e in edges), dtype=np.int32, count=len(edges))
+        dst = np.fromiter((index[e['target']] for e in edges), dtype=np.int32, count=len(edges))
+        weight = np.array([e.get('weight', 0) for e in edges])
+        return cls(node_ids, src, dst, weight, nodes=nodes, edges=edges)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    def edge_mask(self, min_weight):
+        """权重 >= min_weight 且非自环的边"""
+        return (self.weight >= min_weight) & (self.src != self.dst)
+
+    def unique_edge_ids(self, min_weight):
+        """
+        过滤（权重、自环）并按无向端点对去重后的边下标，保持原始顺序：
+        端点规范化为 (min, max)，编码为单个 int64 后 np.unique 取首次出现
+        """
+        edge_ids = np.flatnonzero(self.edge_mask(min_weight))
+        src, dst = self.src[edge_ids], self.dst[edge_ids]
+        lo = np.minimum(src, dst).astype(np.int64)
+        hi = np.maximum(src, dst).astype(np.int64)
+        _, first = np.unique(lo * self.num_nodes + hi, return_index=True)
+        return edge_ids[np.sort(first)]
+
+    def csr(self):
+        """无向 CSR 邻接表 (indptr, indices, edge_ids)，首次调用时构建"""
+        if self._csr is None:
+            heads = np.concatenate([self.src, self.dst])
+            tails = np.concatenate([self.dst, self.src])
+            edge_ids = np.concatenate([np.arange(self.num_edges)] * 2).astype(np.int32)
+            order = np.argsort(heads, kind='stable')
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(heads, minlength=self.num_nodes), out=indptr[1:])
+            self._csr = (indptr, tails[order], edge_ids[order])
+        return self._csr
+
+    def neighbors(self, i):
+        """节点 i 的 (邻居下标数组, 边下标数组)"""
+        indptr, indices, edge_ids = self.csr()
+        return indices[indptr[i]:indptr[i + 1]], edge_ids[indptr[i]:indptr[i + 1]]
+
+    def component_labels(self, min_weight):
+        """连通分量标号：每个节点的标号为其所在分量中最小的节点下标"""
+        mask = self.edge_mask(min_weight)
+        return connected_component_labels(self.num_nodes, self.src[mask], self.dst[mask])
+
+def connected_component_labels(num_nodes, src, dst):
+    """
+    整数数组上的并查集：批量挂接（大根挂到小根）+ 指针跳跃压缩，
+    直到所有边两端同根。返回每个节点的根，即分量内最小下标。
+    """
+    parent = np.arange(num_nodes, dtype=np.int64)
+    while True:
+        root_u, root_v = parent[src], parent[dst]
+        pending = root_u != root_v
+        if not pending.any():
+            return parent
+        lo = np.minimum(root_u[pending], root_v[pending])
+        hi = np.maximum(root_u[pending], root_v[pending])
+        np.minimum.at(parent, hi, lo)
+        # 路径压缩：反复跳跃到祖父节点，直到每个节点直接指向根
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+class LazyRecords:
+    """
+    按需解码的 JSON 记录序列：记录逐行存于 .jsonl 文件，
+    行偏移量存于 .npy 文件，二者均以 mmap 方式打开，多进程共享页缓存。
+    """
+
+    def __init__(self, data_file, offsets_file, graph=None):
+        with open(data_file, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(data_file) else b''
+        self._offsets = np.load(offsets_file, mmap_mode='r')
+        self.graph = graph
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return json.loads(self._data[int(self._offsets[i]):int(self._offsets[i + 1])])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+def cache_dir_for(graph_file):
+    """JSON 图文件对应的二进制缓存目录"""
+    return os.path.splitext(graph_file)[0] + '.cache'
+
+def _write_records(records, data_file, offsets_file):
+    """逐行写出 JSON 记录及其字节偏移量"""
+    offsets = [0]
+    with open(data_file, 'wb') as f:
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(offsets_file, np.array(offsets, dtype=np.int64))
+
+def save_graph_cache(graph, cache_dir):
+    """将整数化图写成二进制缓存：边数组 (.npy) + 节点 id 字符串表 + 逐行记录"""
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(os.path.join(cache_dir, 'src.npy'), graph.src)
+    np.save(os.path.join(cache_dir, 'dst.npy'), graph.dst)
+    np.save(os.path.join(cache_dir, 'weight.npy'), graph.weight)
+    with open(os.path.join(cache_dir, 'node_ids.json'), 'w', encoding='utf-8') as f:
+        json.dump(graph.node_ids, f, ensure_ascii=False)
+    _write_records(graph.nodes, os.path.join(cache_dir, 'nodes.jsonl'),
+                   os.path.join(cache_dir, 'node_offsets.npy'))
+    _write_records(graph.edges, os.path.join(cache_dir, 'edges.jsonl'),
+                   os.path.join(cache_dir, 'edge_offsets.npy'))
+    # meta.json 最后写入，其修改时间即缓存的生成时间
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({"num_nodes": graph.num_nodes, "num_edges": graph.num_edges}, f)
+
+def load_graph_cache(graph_file='idiom_graph.json'):
+    """若二进制缓存存在且比 JSON 新，则以 mmap 方式加载；否则返回 None"""
+    cache_dir = cache_dir_for(graph_file)
+    meta_file = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_file):
+        return None
+    if os.path.exists(graph_file) and os.path.getmtime(meta_file) < os.path.getmtime(graph_file):
+        return None
+
+    with open(os.path.join(cache_dir, 'node_ids.json'), 'r', encoding='utf-8') as f:
+        node_ids = json.load(f)
+    graph = CompactGraph(
+        node_ids,
+        np.load(os.path.join(cache_dir, 'src.npy'), mmap_mode='r'),
+        np.load(os.path.join(cache_dir, 'dst.npy'), mmap_mode='r'),
+        np.load(os.path.join(cache_dir, 'weight.npy'), mmap_mode='r'),
+    )
+    graph.nodes = LazyRecords(os.path.join(cache_dir, 'nodes.jsonl'),
+                              os.path.join(cache_dir, 'node_offsets.npy'), graph)
+    graph.edges = LazyRecords(os.path.join(cache_dir, 'edges.jsonl'),
+                              os.path.join(cache_dir, 'edge_offsets.npy'), graph)
+    return graph
+
+def main():
+    # 一次性将 idiom_graph.json 转换为二进制缓存
+    graph_file = 'idiom_graph.json'
+    with open(graph_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    graph = CompactGraph.from_json(data['nodes'], data['edges'])
+    cache_dir = cache_dir_for(graph_file)
+    save_graph_cache(graph, cache_dir)
+    print(f"二进制缓存已保存到 {cache_dir}（{graph.num_nodes} 个节点, {graph.num_edges} 条边）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+
+from content_store import write_bytes_if_changed
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只生成 .gz
+    brotli = None
+
+DIST_DIR = 'dist'
+# 各生成/提取脚本写出的站点文件（含 manifest 维护的带哈希副本）
+ASSET_PATTERNS = [
+    'index.html', 'idioms_*.html', 'knowledge_graph_*.html', 'question_store.js',
+    'idiom_graph.json', 'idioms_*.json', 'large_subgraph_*.json', 'large_subgraphs_index*.json',
+    'question_shards/*.json',
+]
+
+def find_assets(patterns=ASSET_PATTERNS, root='.'):
+    """按模式列出需要发布的文件（去重、排序）"""
+    found = set()
+    for pattern in patterns:
+        found.update(os.path.relpath(path, root) for path in glob.glob(os.path.join(root, pattern)))
+    return sorted(found)
+
+def minify(path, data):
+    """JSON 去掉缩进与空白；其他文件原样返回"""
+    if path.endswith('.json'):
+        value = json.loads(data.decode('utf-8'))
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return data
+
+def compress_variants(data):
+    """返回 {扩展名: 压缩内容}；gzip 固定 mtime=0，相同输入得到相同字节"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+def build_asset(path, root='.', dist_dir=DIST_DIR):
+    """
+    将一个文件写入 dist 目录：压缩前先最小化，再生成 .gz/.br 兄弟文件
+    （压缩后不更小的变体不生成，服务器将回退到原文件）。
+    返回各版本的字节数，以及实际写入的文件数
+    """
+    with open(os.path.join(root, path), 'rb') as f:
+        original = f.read()
+    data = minify(path, original)
+
+    output_file = os.path.join(dist_dir, path)
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    _, changed = write_bytes_if_changed(output_file, data, manifest_file=None)
+    written = int(changed)
+
+    sizes = {"original": len(original), "minified": len(data)}
+    for ext, compressed in compress_variants(data).items():
+        variant_file = output_file + ext
+        if len(compressed) < len(data):
+            _, changed = write_bytes_if_changed(variant_file, compressed, manifest_file=None)
+            written += changed
+            sizes[ext] = len(compressed)
+        elif os.path.exists(variant_file):
+            os.remove(variant_file)
+    return sizes, written
+
+def build_dist(patterns=ASSET_PATTERNS, root='.', dist_dir=DIST_DIR):
+    """处理全部文件，返回 {文件: 各版本字节数}"""
+    report = {}
+    written = 0
+    for path in find_assets(patterns, root):
+        report[path], n = build_asset(path, root, dist_dir)
+        written += n
+    return report, written
+
+def print_report(report):
+    """打印每个文件及合计的节省字节数"""
+    def kb(n):
+        return f"{n / 1024:.1f} KB"
+
+    encodings = ['.gz', '.br'] if brotli is not None else ['.gz']
+    totals = {key: 0 for key in ['original', 'minified'] + encodings}
+    for path, sizes in report.items():
+        # 某个压缩变体未生成时，按服务器回退到最小化文件计
+        best = {ext: sizes.get(ext, sizes["minified"]) for ext in encodings}
+        totals["original"] += sizes["original"]
+        totals["minified"] += sizes["minified"]
+        for ext in encodings:
+            totals[ext] += best[ext]
+        parts = ', '.join(f"{ext} {kb(best[ext])}" for ext in encodings)
+        print(f"{path}: {kb(sizes['original'])} -> 最小化 {kb(sizes['minified'])}, {parts}")
+
+    print(f"共 {len(report)} 个文件，原始 {kb(totals['original'])}")
+    for key in ['minified'] + encodings:
+        saved = totals['original'] - totals[key]
+        ratio = saved / totals['original'] * 100 if totals['original'] else 0
+        print(f"  {key}: {kb(totals[key])}，节省 {kb(saved)}（{ratio:.1f}%）")
+    if brotli is None:
+        print("未安装 brotli，已跳过 .br 文件（pip install brotli）")
+
+def main():
+    parser = argparse.ArgumentParser(description="生成最小化及预压缩（.gz/.br）的静态站点文件")
+    parser.add_argument("--root", default=".", help="生成文件所在目录")
+    parser.add_argument("--dist", default=DIST_DIR, help="输出目录")
+    parser.add_argument("patterns", nargs="*", default=ASSET_PATTERNS, help="文件匹配模式")
+    args = parser.parse_args()
+
+    report, written = build_dist(args.patterns, args.root, args.dist)
+    print_report(report)
+    print(f"写入 {written} 个文件到 {args.dist}/（其余内容未变化）")
+
+if __name__ == "__main__":
+    main()
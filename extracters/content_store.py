@@ -0,0 +1,130 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+
+MANIFEST_FILE = 'manifest.json'
+
+def content_hash(data):
+    """字节内容的 sha256"""
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(path, chunk_size=1 << 20):
+    """文件内容的 sha256；文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hashed_name(output_file, digest):
+    """带内容哈希的文件名，如 idioms_pairs.3f2a9c1b7e.json"""
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}.{digest[:10]}{ext}"
+
+def write_if_changed(output_file, text, manifest_file=MANIFEST_FILE):
+    """
+    内容与磁盘上已有文件相同则跳过写入。
+    返回 (manifest 条目, 是否写入)；manifest_file 为 None 时不更新清单
+    """
+    return write_bytes_if_changed(output_file, text.encode('utf-8'), manifest_file)
+
+def write_bytes_if_changed(output_file, data, manifest_file=MANIFEST_FILE):
+    """同 write_if_changed，内容为字节串"""
+    digest = content_hash(data)
+    changed = file_hash(output_file) != digest
+    if changed:
+        with open(output_file, 'wb') as f:
+            f.write(data)
+    entry = {output_file: {"hash": digest, "file": hashed_name(output_file, digest), "bytes": len(data)}}
+    if manifest_file is not None:
+        update_manifest(entry, manifest_file)
+    return entry, changed
+
+def replace_if_changed(tmp_file, output_file, manifest_file=MANIFEST_FILE):
+    """已写好的临时文件与目标内容相同则丢弃，否则替换目标文件"""
+    digest = file_hash(tmp_file)
+    changed = file_hash(output_file) != digest
+    if changed:
+        os.replace(tmp_file, output_file)
+    else:
+        os.remove(tmp_file)
+    entry = {output_file: {"hash": digest, "file": hashed_name(output_file, digest),
+                           "bytes": os.path.getsize(output_file)}}
+    if manifest_file is not None:
+        update_manifest(entry, manifest_file)
+    return entry, changed
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def update_manifest(entries, manifest_file=MANIFEST_FILE):
+    """
+    合并清单条目，并为每个文件维护一份带哈希文件名的副本（供长期缓存），
+    内容变化后旧的哈希副本会被删除
+    """
+    manifest = load_manifest(manifest_file)
+    for output_file, entry in entries.items():
+        previous = manifest.get(output_file)
+        if previous and previous["file"] != entry["file"] and os.path.exists(previous["file"]):
+            os.remove(previous["file"])
+        if not os.path.exists(entry["file"]):
+            with open(output_file, 'rb') as src, open(entry["file"], 'wb') as dst:
+                dst.write(src.read())
+        manifest[output_file] = entry
+
+    text = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
+    if file_hash(manifest_file) != content_hash(text.encode('utf-8')):
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return manifest
+
+def remove_outputs(output_files, manifest_file=MANIFEST_FILE):
+    """删除不再生成的输出文件，连同清单条目及其带哈希文件名的副本"""
+    manifest = load_manifest(manifest_file)
+    for output_file in output_files:
+        entry = manifest.pop(output_file, None)
+        for path in (output_file, entry and entry["file"]):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    text = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
+    if file_hash(manifest_file) != content_hash(text.encode('utf-8')):
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return manifest
+
+def rewrite_html_references(html_file, manifest):
+    """把页面中引用的输出文件名替换为清单里的哈希文件名（可重复执行）"""
+    with open(html_file, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    for output_file, entry in manifest.items():
+        stem, ext = os.path.splitext(output_file)
+        pattern = re.compile(r'(?<![\w.])' + re.escape(stem) + r'(?:\.[0-9a-f]{10})?' + re.escape(ext) + r'\b')
+        html = pattern.sub(entry["file"], html)
+
+    _, changed = write_if_changed(html_file, html, manifest_file=None)
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="让 HTML 页面引用带内容哈希的输出文件")
+    parser.add_argument("html_files", nargs="+")
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    for html_file in args.html_files:
+        if rewrite_html_references(html_file, manifest):
+            print(f"已更新引用: {html_file}")
+        else:
+            print(f"无需更新: {html_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+EMBEDDING_CACHE_DIR = 'embeddings.cache'
+
+class EmbeddingCache:
+    """
+    按内容寻址的文本嵌入缓存：sha256(模型名 + 预处理后文本) -> float32 向量。
+    每个模型一个目录：向量逐行追加到 vectors.f32（读取时以 np.memmap 映射），
+    keys.txt 按相同顺序记录每行的键。先写向量后写键，中断后以两者中较短者为准。
+    """
+
+    def __init__(self, model_name, cache_dir=EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.cache_dir = os.path.join(cache_dir, re.sub(r'[^\w.-]', '_', model_name))
+        self.vectors_file = os.path.join(self.cache_dir, 'vectors.f32')
+        self.keys_file = os.path.join(self.cache_dir, 'keys.txt')
+        self.meta_file = os.path.join(self.cache_dir, 'meta.json')
+        self.dim = None
+        self.rows = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.meta_file):
+            return
+        with open(self.meta_file, 'r', encoding='utf-8') as f:
+            self.dim = json.load(f)["dim"]
+        keys = []
+        if os.path.exists(self.keys_file):
+            with open(self.keys_file, 'r', encoding='utf-8') as f:
+                keys = f.read().split()
+        row_bytes = 4 * self.dim
+        size = os.path.getsize(self.vectors_file) if os.path.exists(self.vectors_file) else 0
+
+        # 上次写入中断：截断到向量与键都完整的行数
+        n = min(size // row_bytes, len(keys))
+        if size != n * row_bytes or n != len(keys):
+            with open(self.vectors_file, 'ab') as f:
+                f.truncate(n * row_bytes)
+            with open(self.keys_file, 'w', encoding='utf-8') as f:
+                f.write(''.join(key + '\n' for key in keys[:n]))
+        self.rows = {key: i for i, key in enumerate(keys[:n])}
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _append(self, keys, vectors):
+        """追加新向量（首次写入时记录维度）"""
+        if self.dim is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_file, 'w', encoding='utf-8') as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+        with open(self.vectors_file, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype='<f4').tobytes())
+        with open(self.keys_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(key + '\n' for key in keys))
+        for key in keys:
+            self.rows[key] = len(self.rows)
+
+    def vectors(self):
+        """全部已缓存向量的只读 mmap 视图"""
+        return np.memmap(self.vectors_file, dtype='<f4', mode='r', shape=(len(self.rows), self.dim))
+
+    def get_or_encode(self, texts, encode):
+        """
+        返回与 texts 对应的嵌入矩阵；只把缓存中没有的文本（去重后）交给 encode 编码，
+        新结果写回缓存
+        """
+        keys = [self.key(text) for text in texts]
+        missing = list(dict.fromkeys(key for key in keys if key not in self.rows))
+        hits = sum(key in self.rows for key in keys)
+        print(f"嵌入缓存: 命中 {hits}/{len(texts)}，需编码 {len(missing)} 条")
+        if missing:
+            text_of = dict(zip(keys, texts))
+            self._append(missing, np.asarray(encode([text_of[key] for key in missing]), dtype=np.float32))
+        if not keys:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.array(self.vectors()[[self.rows[key] for key in keys]])
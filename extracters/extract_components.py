@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from community import split_oversized
+from compact_graph import CompactGraph, load_graph_cache
+from content_store import write_if_changed, update_manifest, remove_outputs
+
+# 各分组对应的连通分量大小区间（闭区间）及输出文件
+SIZE_BUCKETS = {
+    "pairs": (2, 2, "idioms_pairs.json"),
+    "trios": (3, 3, "idioms_trios.json"),
+    "quads": (4, 4, "idioms_quads.json"),
+    "pentas": (5, 5, "idioms_pentas.json"),
+    "hexas": (6, 10, "idioms_hexas.json"),
+}
+
+# 单个知识图谱页面的最大节点数，超过则按社区拆分
+LARGE_MAX_SIZE = 150
+
+def load_graph_data(graph_file='idiom_graph.json'):
+    """加载图数据（二进制缓存比 JSON 新时直接以 mmap 方式加载缓存）"""
+    graph = load_graph_cache(graph_file)
+    if graph is not None:
+        return graph.nodes, graph.edges
+    with open(graph_file, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+    return graph['nodes'], graph['edges']
+
+def node_record(node_data):
+    """输出文件中的节点格式"""
+    return {
+        "id": node_data["id"],
+        "explanation": node_data.get("explanation", "无解释"),
+        "similar": node_data.get("similar", []),
+        "opposite": node_data.get("opposite", [])
+    }
+
+def edge_record(edge):
+    """输出文件中的边格式"""
+    return {
+        "source": edge['source'],
+        "target": edge['target'],
+        "weight": edge.get("weight", 0),
+        "questions": edge.get("questions", [])
+    }
+
+def split_large_components(graph, labels, min_weight, min_size, max_size):
+    """
+    节点数超过 max_size 的分量按社区拆分（max_size 为 None 时不拆分）。
+    返回 (labels, from_split, anchors)：from_split 标记原属超限分量的节点，
+    这些节点所在的块均作为大子图输出；
+    anchors 为 {块的标号: 需额外复制进该块的锚点节点}，见 community.split_oversized
+    """
+    from_split = np.zeros(graph.num_nodes, dtype=bool)
+    anchors = {}
+    if max_size is not None:
+        from_split = np.bincount(labels, minlength=graph.num_nodes)[labels] > max_size
+        if from_split.any():
+            labels, anchors = split_oversized(graph, labels, min_weight, max_size, min_size=min_size)
+    return labels, from_split, anchors
+
+def extract_all_buckets(nodes, edges, min_weight=3, min_size=10, buckets=None, labels=None, graph=None,
+                        max_size=None):
+    """
+    一次并查集 + 一次边扫描，同时产出所有大小分组。
+    graph 可传入已构建的 CompactGraph；labels 可传入预先计算的分量标号
+    （如由合并树还原），此时跳过并查集。
+    max_size 不为 None 时，节点数超过 max_size 的分量按社区拆分，
+    拆出的各社区均作为大子图输出，超限分量中的每个节点至少出现在其中一个。
+    返回 (bucket_results, large_subgraphs)：
+      bucket_results: {分组名: {"nodes": [...], "edges": [...]}}
+      large_subgraphs: 节点数 > min_size 的子图列表，每个子图单独一份 nodes/edges
+    """
+    if buckets is None:
+        buckets = SIZE_BUCKETS
+    if graph is None:
+        graph = CompactGraph.from_json(nodes, edges)
+
+    # 整数数组上的并查集：labels[i] 为节点 i 所在分量的最小节点下标
+    if labels is None:
+        labels = graph.component_labels(min_weight)
+    labels, from_split, anchors = split_large_components(graph, labels, min_weight, min_size, max_size)
+    sizes = np.bincount(labels, minlength=graph.num_nodes)
+    sizes[list(anchors)] += 1
+    sizes = sizes.tolist()
+
+    # 分量大小 -> 分组名
+    size_to_bucket = {}
+    for name, (lo, hi, _) in buckets.items():
+        for n in range(lo, hi + 1):
+            size_to_bucket[n] = name
+
+    bucket_results = {name: {"nodes": [], "edges": []} for name in buckets}
+    large_subgraphs = []
+    route = {}  # 根下标 -> 该分量写入的 {"nodes", "edges"}
+
+    # 根下标升序即分量在节点列表中首次出现的顺序
+    for root in np.flatnonzero(sizes).tolist():
+        if from_split[root] or sizes[root] > min_size:
+            target = {"nodes": [], "edges": []}
+            large_subgraphs.append(target)
+        elif sizes[root] in size_to_bucket:
+            target = bucket_results[size_to_bucket[sizes[root]]]
+        else:
+            continue
+        route[root] = target
+
+    # 收集节点信息：按分量分组，组内保持原节点顺序（锚点按其下标插入所在的块）
+    node_labels = np.concatenate([labels, np.array(list(anchors), dtype=np.int64)])
+    node_index = np.concatenate([np.arange(graph.num_nodes), np.array(list(anchors.values()), dtype=np.int64)])
+    node_labels_list = node_labels.tolist()
+    node_index_list = node_index.tolist()
+    for k in np.lexsort((node_index, node_labels)).tolist():
+        target = route.get(node_labels_list[k])
+        if target is not None:
+            target["nodes"].append(node_record(graph.nodes[node_index_list[k]]))
+
+    # 收集边信息：过滤、去重与分桶均为批量数组运算，仅对输出的边构建记录
+    routed = np.zeros(graph.num_nodes, dtype=bool)
+    routed[list(route)] = True
+    edge_ids = graph.unique_edge_ids(min_weight)
+    src_labels, dst_labels = labels[graph.src[edge_ids]], labels[graph.dst[edge_ids]]
+    owners = np.where(src_labels == dst_labels, src_labels, -1)
+    if anchors:
+        # 锚点与块内节点之间的边归入该块
+        anchor_of = np.full(graph.num_nodes, -1, dtype=np.int64)
+        anchor_of[list(anchors)] = list(anchors.values())
+        owners = np.where(anchor_of[dst_labels] == graph.src[edge_ids], dst_labels, owners)
+        owners = np.where(anchor_of[src_labels] == graph.dst[edge_ids], src_labels, owners)
+    keep = owners >= 0
+    keep &= routed[np.where(keep, owners, 0)]
+    for e, root in zip(edge_ids[keep].tolist(), owners[keep].tolist()):
+        route[root]["edges"].append(edge_record(graph.edges[e]))
+
+    return bucket_results, large_subgraphs
+
+def extract_size_range(nodes, edges, lo, hi, min_weight=3):
+    """提取节点数在 [lo, hi] 之间的所有子图，合并为统一格式"""
+    bucket_results, _ = extract_all_buckets(
+        nodes, edges, min_weight=min_weight, min_size=float('inf'),
+        buckets={"range": (lo, hi, None)}
+    )
+    return bucket_results["range"]
+
+def component_id(node_ids):
+    """由成员词语（排序后）计算稳定的分量 id，与编号顺序无关"""
+    return hashlib.sha1('\n'.join(sorted(node_ids)).encode('utf-8')).hexdigest()[:12]
+
+def subgraph_index_entry(output_file, node_ids, n_edges, strength, top_k=5):
+    """索引条目：(分量 id, {文件, 节点数, 边数, 加权度最高的词语})"""
+    top_idioms = sorted(node_ids, key=lambda node_id: -strength.get(node_id, 0))[:top_k]
+    return component_id(node_ids), {
+        "file": output_file,
+        "nodes": len(node_ids),
+        "edges": n_edges,
+        "top_idioms": top_idioms
+    }
+
+def build_subgraph_index(subgraphs, output_prefix='large_subgraph_', output_files=None):
+    """构建 {分量 id: 条目} 索引；output_files 为各子图的文件名，默认按顺序编号"""
+    if output_files is None:
+        output_files = [f"{output_prefix}{i}.json" for i in range(1, len(subgraphs) + 1)]
+    index = {}
+    for subgraph, output_file in zip(subgraphs, output_files):
+        strength = defaultdict(int)
+        for edge in subgraph["edges"]:
+            strength[edge["source"]] += edge["weight"]
+            strength[edge["target"]] += edge["weight"]
+        cid, entry = subgraph_index_entry(
+            output_file, [node["id"] for node in subgraph["nodes"]], len(subgraph["edges"]), strength
+        )
+        index[cid] = entry
+    return index
+
+def assign_subgraph_files(component_ids, previous_index, output_prefix='large_subgraph_'):
+    """
+    为各分量分配输出文件：已在 previous_index 中的分量沿用原文件，
+    新分量依次使用未被占用的最小编号，已有分量的文件名不会因新分量插入而变化
+    """
+    kept = {cid: previous_index[cid]["file"] for cid in component_ids if cid in previous_index}
+    used = set(kept.values())
+    files = []
+    number = 1
+    for cid in component_ids:
+        if cid not in kept:
+            while f"{output_prefix}{number}.json" in used:
+                number += 1
+            kept[cid] = f"{output_prefix}{number}.json"
+            used.add(kept[cid])
+        files.append(kept[cid])
+    return files
+
+def remove_stale_subgraphs(previous_index, output_files, output_prefix='large_subgraph_'):
+    """
+    删除本次不再生成的子图文件：上次索引中记录的文件，以及（无索引时遗留的）
+    按编号命名的 {output_prefix}N.json，只要不在 output_files 中即删除
+    """
+    numbered = re.compile(re.escape(os.path.basename(output_prefix)) + r'\d+\.json$')
+    directory = os.path.dirname(output_prefix) or '.'
+    existing = {os.path.join(os.path.dirname(output_prefix), name)
+                for name in os.listdir(directory) if numbered.match(name)}
+    stale = sorted(({entry['file'] for entry in previous_index.values()} | existing) - set(output_files))
+    remove_outputs(stale)
+    for output_file in stale:
+        print(f"已删除过期文件 {output_file}")
+    return stale
+
+def save_subgraph_index(index, output_file='large_subgraphs_index.json'):
+    """保存分量索引"""
+    _, changed = write_if_changed(output_file, json.dumps(index, ensure_ascii=False, indent=2))
+    if changed:
+        print(f"分量索引已保存到 {output_file}")
+
+def load_subgraph_index(index_file='large_subgraphs_index.json'):
+    """加载分量索引；文件不存在时返回空索引"""
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_to_json(data, output_file):
+    """保存结果到JSON文件（内容未变化时跳过写入，并记录到 manifest.json）"""
+    _, changed = write_if_changed(output_file, json.dumps(data, ensure_ascii=False, indent=2))
+    if changed:
+        print(f"结果已保存到 {output_file}")
+    else:
+        print(f"内容未变化，跳过 {output_file}")
+    return changed
+
+def save_large_subgraphs(subgraphs, output_prefix='large_subgraph_', index_file='large_subgraphs_index.json'):
+    """
+    将每个子图保存为单独的 JSON 文件（内容未变化时跳过写入）。
+    文件名按分量 id 沿用上次索引中的编号，新分量使用空闲编号；不再存在的分量的文件被删除
+    """
+    previous = load_subgraph_index(index_file)
+    component_ids = [component_id(node["id"] for node in subgraph["nodes"]) for subgraph in subgraphs]
+    output_files = assign_subgraph_files(component_ids, previous, output_prefix)
+    entries = {}
+    for subgraph, output_file in zip(subgraphs, output_files):
+        entry, changed = write_if_changed(
+            output_file, json.dumps(subgraph, ensure_ascii=False, indent=2), manifest_file=None
+        )
+        entries.update(entry)
+        if changed:
+            print(f"子图已保存到 {output_file}")
+        else:
+            print(f"子图内容未变化，跳过 {output_file}")
+    update_manifest(entries)
+    remove_stale_subgraphs(previous, output_files, output_prefix)
+    save_subgraph_index(build_subgraph_index(subgraphs, output_prefix, output_files), index_file)
+
+def save_all(bucket_results, large_subgraphs):
+    """保存所有分组及大子图"""
+    for name, (_, _, output_file) in SIZE_BUCKETS.items():
+        data = bucket_results[name]
+        save_to_json(data, output_file)
+        print(f"  {name}: {len(data['nodes'])} 个节点, {len(data['edges'])} 条边")
+
+    # 没有大子图时也要清理上次遗留的子图文件与索引
+    save_large_subgraphs(large_subgraphs)
+    if not large_subgraphs:
+        print("未找到节点数量大于 10 的子图。")
+
+def main():
+    # 加载数据（只加载一次）
+    nodes, edges = load_graph_data()
+    graph = CompactGraph.from_json(nodes, edges)
+
+    # 一次遍历产出所有分组
+    bucket_results, large_subgraphs = extract_all_buckets(
+        nodes, edges, min_weight=3, min_size=10, graph=graph, max_size=LARGE_MAX_SIZE
+    )
+
+    # 保存结果
+    save_all(bucket_results, large_subgraphs)
+
+if __name__ == "__main__":
+    main()
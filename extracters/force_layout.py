@@ -0,0 +1,120 @@
+import numpy as np
+
+def _initial_positions(n):
+    """与 d3 相同的叶序初始布局"""
+    i = np.arange(n)
+    radius = 10 * np.sqrt(0.5 + i)
+    angle = i * np.pi * (3 - np.sqrt(5))
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+
+def _repulsion_exact(pos, strength, alpha):
+    """精确的两两排斥（O(n^2)，分块计算以限制内存）"""
+    n = len(pos)
+    x, y = pos[:, 0], pos[:, 1]
+    velocity = np.zeros_like(pos)
+    block = max(1, 2_000_000 // max(n, 1))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        dx = x[None, :] - x[start:stop, None]
+        dy = y[None, :] - y[start:stop, None]
+        dist2 = dx * dx + dy * dy
+        # 与 d3 一致：距离过近时 l = sqrt(l)，避免力发散；重合点不施力
+        near = dist2 < 1
+        dist2[near] = np.sqrt(dist2[near])
+        dist2[dist2 == 0] = np.inf
+        w = (strength * alpha) / dist2
+        velocity[start:stop, 0] = (dx * w).sum(axis=1)
+        velocity[start:stop, 1] = (dy * w).sum(axis=1)
+    return velocity
+
+def _repulsion_grid(pos, strength, alpha, cells_per_side):
+    """
+    网格近似排斥：同一格内精确计算，其他格视为位于质心、质量为节点数的单点，
+    复杂度约 O(n * 格数)。格线取坐标分位数，节点密集处格子更小，各格节点数较均衡
+    """
+    n = len(pos)
+    quantiles = np.linspace(0, 1, cells_per_side + 1)[1:-1]
+    cell_x = np.searchsorted(np.quantile(pos[:, 0], quantiles), pos[:, 0])
+    cell_y = np.searchsorted(np.quantile(pos[:, 1], quantiles), pos[:, 1])
+    cell = cell_x * cells_per_side + cell_y
+    n_cells = cells_per_side * cells_per_side
+
+    count = np.bincount(cell, minlength=n_cells).astype(np.float64)
+    occupied = np.flatnonzero(count)
+    mass = count[occupied]
+    centroid_x = np.bincount(cell, weights=pos[:, 0], minlength=n_cells)[occupied] / mass
+    centroid_y = np.bincount(cell, weights=pos[:, 1], minlength=n_cells)[occupied] / mass
+
+    # 远场：节点 -> 各格质心（排除自身所在格）
+    dx = centroid_x[None, :] - pos[:, 0, None]
+    dy = centroid_y[None, :] - pos[:, 1, None]
+    w = (strength * alpha) * mass[None, :] / np.maximum(dx * dx + dy * dy, 1.0)
+    w[occupied[None, :] == cell[:, None]] = 0.0
+    velocity = np.stack([(dx * w).sum(axis=1), (dy * w).sum(axis=1)], axis=1)
+
+    # 近场：格内精确计算
+    order = np.argsort(cell, kind='stable')
+    bounds = np.r_[0, np.cumsum(mass).astype(np.int64)]
+    for k in range(len(occupied)):
+        members = order[bounds[k]:bounds[k + 1]]
+        if len(members) > 1:
+            velocity[members] += _repulsion_exact(pos[members], strength, alpha)
+    return velocity
+
+def force_layout(nodes, edges, iterations=300, link_distance=200, charge=-400,
+                 velocity_decay=0.4, exact_limit=300, seed=42):
+    """
+    离线计算力导向布局，参数与页面中的 d3 力模型一致
+    （forceLink.distance=200, forceManyBody.strength=-400, forceCenter）。
+    节点数不超过 exact_limit 时精确计算排斥力，否则使用网格近似。
+    返回 {节点id: (x, y)}，坐标以 (0, 0) 为中心。
+    """
+    node_ids = [node["id"] for node in nodes]
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    def endpoint(value):
+        return index[value["id"] if isinstance(value, dict) else value]
+
+    src = np.array([endpoint(e["source"]) for e in edges], dtype=np.int64)
+    dst = np.array([endpoint(e["target"]) for e in edges], dtype=np.int64)
+
+    # d3 forceLink 的默认强度与偏置
+    degree = np.bincount(np.concatenate([src, dst]), minlength=n).astype(np.float64)
+    link_strength = 1.0 / np.maximum(np.minimum(degree[src], degree[dst]), 1)
+    bias = degree[src] / np.maximum(degree[src] + degree[dst], 1)
+
+    rng = np.random.default_rng(seed)
+    pos = _initial_positions(n)
+    vel = np.zeros_like(pos)
+    # 约 sqrt(n) 个格子，远场与近场的计算量都约为 O(n^1.5)
+    cells_per_side = max(2, int(round(n ** 0.25)))
+
+    alpha = 1.0
+    alpha_decay = 1 - 0.001 ** (1 / iterations)
+    for _ in range(iterations):
+        alpha += (0 - alpha) * alpha_decay
+
+        # 连接力
+        if len(src):
+            delta = (pos[dst] + vel[dst]) - (pos[src] + vel[src])
+            delta[(delta == 0).all(axis=1)] = rng.normal(scale=1e-6, size=2)
+            length = np.sqrt((delta ** 2).sum(axis=1))
+            delta *= ((length - link_distance) / length * alpha * link_strength)[:, None]
+            np.add.at(vel, dst, -delta * bias[:, None])
+            np.add.at(vel, src, delta * (1 - bias)[:, None])
+
+        # 排斥力
+        if n <= exact_limit:
+            vel += _repulsion_exact(pos, charge, alpha)
+        else:
+            vel += _repulsion_grid(pos, charge, alpha, cells_per_side)
+
+        vel *= 1 - velocity_decay
+        pos += vel
+        # 中心力
+        pos -= pos.mean(axis=0)
+
+    return {node_id: (round(float(x), 1), round(float(y), 1)) for node_id, (x, y) in zip(node_ids, pos)}
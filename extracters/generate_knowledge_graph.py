@@ -1,12 +1,103 @@
+import argparse
 import json
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="knowledge_graph.html"):
+from extract_components import SIZE_BUCKETS, component_id, load_subgraph_index
+from force_layout import force_layout
+
+# 可选依赖 pypinyin（pip install pypinyin）：页面搜索框支持按拼音首字母查找词语（如 xz -> 限制）。
+# 未安装时仍可生成页面，但拼音首字母索引为空，生成时会打印提示
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:
+    lazy_pinyin = None
+
+PINYIN_WARNING = "提示: 未安装 pypinyin，页面不含拼音首字母搜索（pip install pypinyin）"
+
+# 与 json.dumps(..., ensure_ascii=False) 输出一致，但按片段产出
+_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+def referenced_questions(subgraph_data, questions_data):
+    """只保留子图边上引用到的题目（题库的键为字符串，题号统一按字符串查找）"""
+    referenced = {}
+    for edge in subgraph_data["edges"]:
+        for qid in edge.get("questions", []):
+            key = str(qid)
+            if key not in referenced and key in questions_data:
+                referenced[key] = questions_data[key]
+    return referenced
+
+
+def pinyin_initials(text):
+    """词语的拼音首字母，如 限制 -> xz；未安装 pypinyin 时返回空串"""
+    if lazy_pinyin is None:
+        return ""
+    return "".join(lazy_pinyin(text, style=Style.FIRST_LETTER)).lower()
+
+
+def _grams(text):
+    """小写后的单字与相邻两字"""
+    text = text.lower()
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def build_search_index(nodes):
+    """
+    节点搜索索引：1/2 字 n-gram -> 节点下标（升序）的倒排表。
+    "name" 覆盖词语本身及其拼音首字母，"text" 覆盖解释与近义/反义词；
+    页面先查 name，无结果时再查 text。n-gram 在各字段内分别切分，不跨字段
+    """
+    name, text = defaultdict(list), defaultdict(list)
+    initials = []
+    for i, node in enumerate(nodes):
+        initials.append(pinyin_initials(node["id"]))
+        for gram in _grams(node["id"]) | _grams(initials[-1]):
+            name[gram].append(i)
+        fields = [node.get("explanation") or ""] + list(node.get("similar") or []) + list(node.get("opposite") or [])
+        for gram in set().union(*(_grams(field) for field in fields)):
+            text[gram].append(i)
+    return {"initials": initials, "name": name, "text": text}
+
+
+def write_json(f, value):
+    """把 JSON 分片段直接写入文件，不在内存中拼出完整字符串；返回写入的字节数"""
+    written = 0
+    for chunk in _ENCODER.iterencode(value):
+        f.write(chunk)
+        written += len(chunk.encode("utf-8"))
+    return written
+
+
+def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="knowledge_graph.html", layout=None,
+                                  verbose=True):
     """
     1) 小球半径=54(原36的1.5倍)
     2) 词语间距增大: link distance=200, charge strength=-400
     3) 搜索匹配成功 => 小球背景变红, 否则恢复skyblue
+    4) layout="frozen"/"relaxed" => 离线预计算坐标并写入节点,
+       页面直接按坐标渲染(冻结)或仅做轻微松弛; 默认 None 仍由浏览器从头模拟
+    5) 只嵌入子图边上引用到的题目, 而非整个题库
+    6) 页面模板与数据逐段流式写入文件, 不构造整页字符串, 内存占用与数据大小无关
+    7) 预生成 n-gram / 拼音首字母搜索索引, 页面按索引查找而非逐个节点扫描
+    返回 {"questions": 嵌入题目数, "question_bytes": 题目数据字节数, "bytes": 页面字节数}
     """
-    html_content = f"""<!DOCTYPE html>
+    page_questions = referenced_questions(subgraph_data, questions_data)
+    search_index = build_search_index(subgraph_data["nodes"])
+
+    if layout is not None:
+        positions = force_layout(subgraph_data["nodes"], subgraph_data["edges"])
+        subgraph_data = dict(subgraph_data)
+        subgraph_data["nodes"] = [
+            dict(node, x=positions[node["id"]][0], y=positions[node["id"]][1])
+            for node in subgraph_data["nodes"]
+        ]
+
+    with open(output_html, "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8" />
@@ -128,9 +219,18 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
     <script>
     // 1. 载入数据
     var graphData = {{
-        "nodes": {json.dumps(subgraph_data["nodes"], ensure_ascii=False)},
-        "edges": {json.dumps(subgraph_data["edges"], ensure_ascii=False)},
-        "questions": {json.dumps(questions_data, ensure_ascii=False)}
+        "nodes": """)
+        write_json(f, subgraph_data["nodes"])
+        f.write(""",
+        "edges": """)
+        write_json(f, subgraph_data["edges"])
+        f.write(""",
+        "questions": """)
+        questions_bytes = write_json(f, page_questions)
+        f.write(""",
+        "search": """)
+        write_json(f, search_index)
+        f.write(f"""
     }};
 
     var container = document.getElementById("graph");
@@ -155,6 +255,15 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
     var maxWeight = d3.max(graphData.edges, function(e) {{return e.weight;}});
     var scaleStroke = d3.scaleLinear().domain([0, maxWeight]).range([2,15]);
 
+    // 预计算布局: 坐标以(0,0)为中心, 平移到画布中心
+    var layoutMode = {json.dumps(layout)};
+    if(layoutMode) {{
+        graphData.nodes.forEach(function(n) {{
+            n.x += width/2;
+            n.y += height/2;
+        }});
+    }}
+
     var simulation = d3.forceSimulation(graphData.nodes)
         .force("link", d3.forceLink(graphData.edges)
             .id(function(d) {{ return d.id; }})
@@ -200,7 +309,7 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
         .attr("dy", "0.35em")
         .text(function(d) {{ return d.id; }});
 
-    simulation.on("tick", function() {{
+    function ticked() {{
         link
             .attr("x1", function(d) {{ return d.source.x; }})
             .attr("y1", function(d) {{ return d.source.y; }})
@@ -210,7 +319,16 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
         nodeGroup.attr("transform", function(d) {{
             return "translate(" + d.x + "," + d.y + ")";
         }});
-    }});
+    }}
+    simulation.on("tick", ticked);
+
+    // 冻结: 不再模拟, 直接按预计算坐标绘制; 松弛: 低能量下微调
+    if(layoutMode === "frozen") {{
+        simulation.stop();
+        ticked();
+    }} else if(layoutMode === "relaxed") {{
+        simulation.alpha(0.05).restart();
+    }}
 
     function dragstarted(event, d) {{
         if(!event.active) simulation.alphaTarget(0.3).restart();
@@ -227,7 +345,55 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
         d.fy = null;
     }}
 
-    // 4. 实时搜索 => 匹配成功 => 小球背景变红，否则保持skyblue
+    // 4. 实时搜索 => 查预生成的 n-gram 索引 => 匹配成功 => 小球背景变红，否则保持skyblue
+    var searchIndex = graphData.search;
+
+    // 两个升序下标数组求交
+    function intersectSorted(a, b) {{
+        var result = [], i = 0, j = 0;
+        while(i < a.length && j < b.length) {{
+            if(a[i] === b[j]) {{ result.push(a[i]); i++; j++; }}
+            else if(a[i] < b[j]) {{ i++; }}
+            else {{ j++; }}
+        }}
+        return result;
+    }}
+
+    // 关键字的全部 n-gram 都出现的节点下标（候选，仍需核对是否连续出现）
+    function candidates(postings, keyword) {{
+        var grams = [];
+        if(keyword.length === 1) {{
+            grams.push(keyword);
+        }} else {{
+            for(var i = 0; i + 2 <= keyword.length; i++) {{
+                grams.push(keyword.substr(i, 2));
+            }}
+        }}
+        var result = null;
+        for(var k = 0; k < grams.length; k++) {{
+            if(!Object.prototype.hasOwnProperty.call(postings, grams[k])) return [];
+            var list = postings[grams[k]];
+            result = result === null ? list : intersectSorted(result, list);
+            if(result.length === 0) return result;
+        }}
+        return result;
+    }}
+
+    function nameFields(i) {{
+        return [graphData.nodes[i].id, searchIndex.initials[i]];
+    }}
+    function textFields(i) {{
+        var n = graphData.nodes[i];
+        return [n.explanation || ""].concat(n.similar || [], n.opposite || []);
+    }}
+    function lookup(postings, fields, keyword) {{
+        return candidates(postings, keyword).filter(function(i) {{
+            return fields(i).some(function(field) {{
+                return field.toLowerCase().indexOf(keyword) !== -1;
+            }});
+        }});
+    }}
+
     var searchInput = document.getElementById("searchInput");
     searchInput.addEventListener("input", function(evt) {{
         var keyword = searchInput.value.trim().toLowerCase();
@@ -237,29 +403,24 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
             return;
         }}
 
-        // 找出匹配的词语
-        var matchedNodes = [];
-        graphData.nodes.forEach(function(n) {{
-            if(n.id.toLowerCase().indexOf(keyword) !== -1) {{
-                matchedNodes.push(n);
-            }}
-        }});
+        // 找出匹配的词语: 先按词语/拼音首字母, 无结果再按解释与近反义词
+        var matchedIndices = lookup(searchIndex.name, nameFields, keyword);
+        if(matchedIndices.length === 0) {{
+            matchedIndices = lookup(searchIndex.text, textFields, keyword);
+        }}
+        var matchedNodes = matchedIndices.map(function(i) {{ return graphData.nodes[i]; }});
+        var matchedSet = new Set(matchedNodes);
 
-        // 先全部恢复 skyblue
-        nodeGroup.select("circle").attr("fill", "skyblue");
+        // 匹配到的词语 circle 改成红色, 其余恢复 skyblue
+        nodeGroup.select("circle").attr("fill", function(d) {{
+            return matchedSet.has(d) ? "red" : "skyblue";
+        }});
 
         if(matchedNodes.length === 0) {{
             // 无匹配 => 不居中不提示
             return;
         }}
 
-        // 把匹配到的词语 circle 改成红色
-        nodeGroup.each(function(d) {{
-            if(matchedNodes.indexOf(d) !== -1) {{
-                d3.select(this).select("circle").attr("fill", "red");
-            }}
-        }});
-
         // 若仅匹配1个 => 定位缩放
         if(matchedNodes.length === 1) {{
             centerNode(matchedNodes[0]);
@@ -363,15 +524,153 @@ def generate_knowledge_graph_html(subgraph_data, questions_data, output_html="kn
     </script>
 </body>
 </html>
-"""
-    with open(output_html, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    print(f"新的知识图谱已生成: {output_html}")
+""")
+    stats = {"questions": len(page_questions), "question_bytes": questions_bytes,
+             "bytes": os.path.getsize(output_html)}
+    if verbose:
+        print(f"新的知识图谱已生成: {output_html}")
+        print(f"  嵌入题目 {stats['questions']}/{len(questions_data)} 道, "
+              f"题目数据 {questions_bytes / 1024:.1f} KB, "
+              f"页面共 {stats['bytes'] / 1024:.1f} KB")
+        if lazy_pinyin is None:
+            print(PINYIN_WARNING)
+    return stats
+
+
+def resolve_component(key, index_file="large_subgraphs_index.json"):
+    """
+    按稳定分量 id（可只写前缀）或分量中的代表词语查找子图，
+    返回 (分量 id, 子图文件)。编号变化不会影响解析结果。
+    找不到或无法唯一确定时抛出 KeyError。
+    """
+    index = load_subgraph_index(index_file)
+    if not index:
+        raise KeyError(f"{index_file} 不存在或为空，请先运行 extract_components.py")
+
+    matches = [cid for cid in index if cid.startswith(key)]
+    if not matches:
+        matches = [cid for cid, entry in index.items() if key in entry["top_idioms"]]
+    if len(matches) != 1:
+        raise KeyError(f"无法唯一确定分量 {key!r}，候选: {matches}")
+    return matches[0], index[matches[0]]["file"]
+
+
+def _load_node_ids(subgraph_file):
+    with open(subgraph_file, "r", encoding="utf-8") as f:
+        return [node["id"] for node in json.load(f)["nodes"]]
+
+
+def discover_pages(index_file="large_subgraphs_index.json", output_prefix="large_subgraph_"):
+    """
+    列出需要生成的页面 [(子图文件, 页面文件)]：
+    索引中的各大子图 -> knowledge_graph_<分量id>.html（没有索引时按编号扫描
+    output_prefix<N>.json 并由成员计算分量 id），
+    各分组文件 idioms_X.json -> knowledge_graph_X.html；不存在或没有节点的文件跳过
+    """
+    pages = []
+    index = load_subgraph_index(index_file)
+    if index:
+        for cid, entry in index.items():
+            if entry["nodes"] and os.path.exists(entry["file"]):
+                pages.append((entry["file"], f"knowledge_graph_{cid}.html"))
+    else:
+        numbered = re.compile(re.escape(output_prefix) + r"(\d+)\.json$")
+        found = []
+        for name in os.listdir("."):
+            match = numbered.match(name)
+            if match:
+                found.append((int(match.group(1)), name))
+        found.sort()
+        if found:
+            print(f"警告: 未找到 {index_file}，按文件名扫描到 {len(found)} 个大子图；"
+                  f"运行 extract_components.py 可生成索引")
+        for _, subgraph_file in found:
+            node_ids = _load_node_ids(subgraph_file)
+            if node_ids:
+                pages.append((subgraph_file, f"knowledge_graph_{component_id(node_ids)}.html"))
+    for name, (_, _, bundle_file) in SIZE_BUCKETS.items():
+        if os.path.exists(bundle_file) and _load_node_ids(bundle_file):
+            pages.append((bundle_file, f"knowledge_graph_{name}.html"))
+    return pages
+
+
+# 工作进程内的共享数据：题库只在主进程读取一次，经初始化函数传给各进程
+_worker_questions = None
+_worker_layout = None
+
+def _init_worker(questions_data, layout):
+    global _worker_questions, _worker_layout
+    _worker_questions = questions_data
+    _worker_layout = layout
+
+def _render_page(subgraph_file, output_html):
+    start = time.perf_counter()
+    with open(subgraph_file, "r", encoding="utf-8") as f:
+        subgraph_data = json.load(f)
+    stats = generate_knowledge_graph_html(subgraph_data, _worker_questions, output_html,
+                                          layout=_worker_layout, verbose=False)
+    stats["nodes"] = len(subgraph_data["nodes"])
+    stats["edges"] = len(subgraph_data["edges"])
+    return output_html, stats, time.perf_counter() - start
+
+
+def generate_all(questions_file="merged_questions.json", workers=None, layout=None,
+                 index_file="large_subgraphs_index.json"):
+    """用进程池为所有大子图及分组文件生成页面，逐页输出耗时"""
+    pages = discover_pages(index_file)
+    if not pages:
+        print("未找到可生成页面的子图文件。")
+        return []
+
+    start = time.perf_counter()
+    with open(questions_file, "r", encoding="utf-8") as f:
+        questions_data = json.load(f)
+    print(f"题库已加载: {len(questions_data)} 道（{time.perf_counter() - start:.2f}s），"
+          f"共 {len(pages)} 个页面待生成")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(questions_data, layout)) as pool:
+        futures = {pool.submit(_render_page, subgraph_file, output_html): subgraph_file
+                   for subgraph_file, output_html in pages}
+        for future in as_completed(futures):
+            output_html, stats, seconds = future.result()
+            results.append((output_html, stats, seconds))
+            print(f"{output_html} <- {futures[future]}: {stats['nodes']} 个节点, {stats['edges']} 条边, "
+                  f"{stats['questions']} 道题, {stats['bytes'] / 1024:.1f} KB, {seconds:.2f}s")
+
+    total = time.perf_counter() - start
+    busy = sum(seconds for _, _, seconds in results)
+    print(f"共生成 {len(results)} 个页面，总耗时 {total:.2f}s（各页累计 {busy:.2f}s）")
+    if lazy_pinyin is None:
+        print(PINYIN_WARNING)
+    return results
 
 
 def main():
-    # 1. 读取 large_subgraph_2.json
-    with open("large_subgraph_11.json", "r", encoding="utf-8") as f:
+    parser = argparse.ArgumentParser(description="为指定分量（或全部分量）生成知识图谱页面")
+    parser.add_argument("component", nargs="?",
+                        help="分量 id（或其前缀）或分量中的代表词语，见 large_subgraphs_index.json")
+    parser.add_argument("--all", action="store_true",
+                        help="批量生成所有大子图及 idioms_*.json 分组的页面")
+    parser.add_argument("--workers", type=int, default=None, help="--all 时的进程数，默认 CPU 核数")
+    parser.add_argument("--output", default=None, help="默认 knowledge_graph_<分量id>.html")
+    parser.add_argument("--layout", choices=["frozen", "relaxed"], default=None,
+                        help="离线预计算节点坐标；frozen 直接渲染，relaxed 仅轻微松弛")
+    args = parser.parse_args()
+
+    if args.all:
+        generate_all(workers=args.workers, layout=args.layout)
+        return
+    if args.component is None:
+        parser.error("需要指定分量，或使用 --all")
+
+    # 1. 按稳定 id 找到子图文件
+    try:
+        cid, subgraph_file = resolve_component(args.component)
+    except KeyError as e:
+        parser.error(e.args[0])
+    with open(subgraph_file, "r", encoding="utf-8") as f:
         subgraph_data = json.load(f)
 
     # 2. 读取 merged_questions.json
@@ -379,7 +678,8 @@ def main():
         questions_data = json.load(f)
 
     # 3. 生成 HTML
-    generate_knowledge_graph_html(subgraph_data, questions_data, "knowledge_graph_11.html")
+    generate_knowledge_graph_html(subgraph_data, questions_data, args.output or f"knowledge_graph_{cid}.html",
+                                  layout=args.layout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOOKUP_FILE = 'idiom_lookup.json'
+# 各分组输出文件，与 extract_components.SIZE_BUCKETS 一致（本工具只依赖标准库，不导入提取引擎）
+BUCKET_FILES = ('idioms_pairs.json', 'idioms_trios.json', 'idioms_quads.json',
+                'idioms_pentas.json', 'idioms_hexas.json')
+SOURCES = ('idiom_graph.json', 'large_subgraphs_index.json') + BUCKET_FILES
+
+def build_lookup_index(graph_file='idiom_graph.json', subgraph_index_file='large_subgraphs_index.json'):
+    """
+    词语 -> {"file": 所在输出文件, "component": 大子图的稳定 id,
+             "neighbors": [[共现词语, 权重], ...]（按权重降序）, "questions": [题号, ...]}。
+    共现关系与题号取自 idiom_graph.json 的全部边；所在文件取自已输出的分组文件与大子图索引
+    """
+    with open(graph_file, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+
+    weights = {node['id']: {} for node in graph['nodes']}
+    questions = {node['id']: set() for node in graph['nodes']}
+    for edge in graph['edges']:
+        u, v = edge['source'], edge['target']
+        if u == v:
+            continue
+        w = edge.get('weight', 0)
+        weights[u][v] = weights[u].get(v, 0) + w
+        weights[v][u] = weights[v].get(u, 0) + w
+        questions[u].update(edge.get('questions', []))
+        questions[v].update(edge.get('questions', []))
+
+    location = {}
+    for output_file in BUCKET_FILES:
+        if os.path.exists(output_file):
+            with open(output_file, 'r', encoding='utf-8') as f:
+                for node in json.load(f)['nodes']:
+                    location[node['id']] = (output_file, None)
+    if os.path.exists(subgraph_index_file):
+        with open(subgraph_index_file, 'r', encoding='utf-8') as f:
+            subgraph_index = json.load(f)
+        for cid, entry in subgraph_index.items():
+            with open(entry['file'], 'r', encoding='utf-8') as f:
+                for node in json.load(f)['nodes']:
+                    location[node['id']] = (entry['file'], cid)
+
+    index = {}
+    for idiom, neighbor_weights in weights.items():
+        output_file, cid = location.get(idiom, (None, None))
+        index[idiom] = {
+            "file": output_file,
+            "component": cid,
+            "neighbors": sorted(([other, w] for other, w in neighbor_weights.items()),
+                                key=lambda item: (-item[1], item[0])),
+            "questions": sorted(questions[idiom], key=str),
+        }
+    return index
+
+def save_lookup_index(index, output_file=LOOKUP_FILE):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    print(f"查询索引已保存到 {output_file}（{len(index)} 个词语）")
+
+def load_lookup_index(lookup_file=LOOKUP_FILE, sources=SOURCES):
+    """加载查询索引；若文件不存在或比数据源旧则返回 None"""
+    if not os.path.exists(lookup_file):
+        return None
+    mtime = os.path.getmtime(lookup_file)
+    if any(os.path.exists(source) and mtime < os.path.getmtime(source) for source in sources):
+        return None
+    with open(lookup_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def lookup(index, idiom):
+    """词语所在文件及分量；未收录时返回 None"""
+    entry = index.get(idiom)
+    if entry is None:
+        return None
+    return {"idiom": idiom, "file": entry["file"], "component": entry["component"],
+            "degree": len(entry["neighbors"]), "questions": len(entry["questions"])}
+
+def top_neighbors(index, idiom, k=10):
+    """共现权重最高的 k 个词语"""
+    entry = index.get(idiom)
+    if entry is None:
+        return None
+    return [{"idiom": other, "weight": w} for other, w in entry["neighbors"][:k]]
+
+def shared_questions(index, a, b):
+    """两个词语共同出现的题号"""
+    if a not in index or b not in index:
+        return None
+    other = set(index[b]["questions"])
+    return [qid for qid in index[a]["questions"] if qid in other]
+
+def answer(index, path, params):
+    """按请求路径与参数返回查询结果（HTTP 与命令行共用）"""
+    def param(name, default=None):
+        return params.get(name, [default])[0]
+
+    if path == '/lookup':
+        return lookup(index, param('idiom'))
+    if path == '/neighbors':
+        return top_neighbors(index, param('idiom'), int(param('k', 10)))
+    if path == '/shared':
+        return shared_questions(index, param('a'), param('b'))
+    raise KeyError(path)
+
+def make_handler(index):
+    class LookupHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            start = time.perf_counter()
+            try:
+                result = answer(index, url.path, parse_qs(url.query))
+                status = 200 if result is not None else 404
+            except KeyError:
+                result, status = None, 404
+            except ValueError as e:
+                result, status = {"error": str(e)}, 400
+            body = json.dumps({"result": result, "elapsed_ms": (time.perf_counter() - start) * 1000},
+                              ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return LookupHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="本地词语查询：所在子图文件、共现词语、共同考题")
+    parser.add_argument("idiom", nargs="?", help="要查询的词语")
+    parser.add_argument("--neighbors", type=int, metavar="K", help="列出共现权重最高的 K 个词语")
+    parser.add_argument("--shared", metavar="OTHER", help="列出与另一个词语的共同考题")
+    parser.add_argument("--serve", action="store_true", help="启动 HTTP 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rebuild", action="store_true", help="忽略已有索引，重新构建")
+    args = parser.parse_args()
+
+    # 优先复用已保存的索引，数据源更新后自动重建
+    index = None if args.rebuild else load_lookup_index()
+    if index is None:
+        index = build_lookup_index()
+        save_lookup_index(index)
+
+    if args.serve:
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(index))
+        print(f"查询服务已启动: http://{args.host}:{args.port}/lookup?idiom=...（另有 /neighbors、/shared）")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+        return
+    if args.idiom is None:
+        parser.error("需要指定词语，或使用 --serve")
+
+    start = time.perf_counter()
+    if args.shared:
+        result = shared_questions(index, args.idiom, args.shared)
+    elif args.neighbors:
+        result = top_neighbors(index, args.idiom, args.neighbors)
+    else:
+        result = lookup(index, args.idiom)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result is None:
+        print(f"未收录词语: {args.idiom}")
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"查询耗时 {elapsed:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from collections import deque
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多关键词匹配：构建一次自动机，之后对任意文本单遍扫描，
+    找出其中出现的全部关键词，耗时只与文本长度有关，与关键词数量无关。
+    失败转移在构建时展开为完整的状态转移表，扫描时每个字符只查一次字典。
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        goto = [{}]
+        outputs = [[]]
+        for pattern_id, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].append(pattern_id)
+
+        # 按广度优先顺序计算失败指针，并把转移表补全为 DFA
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+        self._delta = delta
+        self._outputs = [tuple(o) for o in outputs]
+
+    def find_all(self, text):
+        """文本中出现过的关键词集合"""
+        delta, outputs = self._delta, self._outputs
+        hits = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                hits.update(outputs[state])
+        return {self.keywords[pattern_id] for pattern_id in hits}
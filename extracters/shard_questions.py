@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import re
+
+from content_store import write_if_changed, update_manifest, remove_outputs
+
+SHARD_DIR = 'question_shards'
+SHARD_SIZE = 100
+
+def string_hash(text):
+    """FNV-1a 32 位哈希（UTF-8 字节），与 question_store.js 中的 stringHash 一致"""
+    h = 0x811c9dc5
+    for byte in text.encode('utf-8'):
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return h
+
+def shard_key(qid, index):
+    """题号所在的分片号：数字题号按区间分片，否则按哈希分片"""
+    if index["scheme"] == "range":
+        return int(qid) // index["shard_size"]
+    return string_hash(str(qid)) % index["shard_count"]
+
+def shard_questions(questions_data, shard_size=SHARD_SIZE):
+    """
+    将题库切分为小分片，返回 (索引, {分片号: 题目字典})。
+    题号全为数字时按区间 [k*shard_size, (k+1)*shard_size) 分片，相邻题号落在同一分片；
+    否则按题号哈希分片，分片数约为 题目数 / shard_size
+    """
+    numeric = all(str(qid).isdigit() for qid in questions_data)
+    index = {"scheme": "range" if numeric else "hash", "shard_size": shard_size,
+             "shard_count": max(1, -(-len(questions_data) // shard_size)), "count": len(questions_data)}
+
+    shards = {}
+    for qid in sorted(questions_data, key=int if numeric else str):
+        shards.setdefault(shard_key(qid, index), {})[str(qid)] = questions_data[qid]
+    index["shards"] = {str(key): f"questions_{key}.json" for key in sorted(shards)}
+    return index, shards
+
+def save_question_shards(index, shards, shard_dir=SHARD_DIR):
+    """写出分片与索引（内容未变化的文件不重写），并删除不再使用的旧分片"""
+    os.makedirs(shard_dir, exist_ok=True)
+    entries = {}
+    changed = 0
+    for key, questions in shards.items():
+        output_file = os.path.join(shard_dir, index["shards"][str(key)])
+        entry, written = write_if_changed(output_file, json.dumps(questions, ensure_ascii=False),
+                                          manifest_file=None)
+        entries.update(entry)
+        changed += written
+
+    # 清理不再使用的旧分片（questions_<分片号>.json）及其带哈希的副本
+    keep = set(index["shards"].values())
+    remove_outputs([os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+                    if re.fullmatch(r'questions_\d+\.json', name) and name not in keep])
+
+    entry, _ = write_if_changed(os.path.join(shard_dir, 'index.json'),
+                                json.dumps(index, ensure_ascii=False, indent=2), manifest_file=None)
+    entries.update(entry)
+    update_manifest(entries)
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="将 merged_questions.json 切分为按需加载的小分片")
+    parser.add_argument("--questions", default="merged_questions.json")
+    parser.add_argument("--output-dir", default=SHARD_DIR)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions_data = json.load(f)
+
+    index, shards = shard_questions(questions_data, args.shard_size)
+    changed = save_question_shards(index, shards, args.output_dir)
+    sizes = [len(json.dumps(q, ensure_ascii=False).encode('utf-8')) for q in shards.values()]
+    print(f"{index['count']} 道题目 -> {len(shards)} 个分片（{index['scheme']}），"
+          f"其中 {changed} 个有变化；分片平均 {sum(sizes) / max(len(sizes), 1) / 1024:.1f} KB，"
+          f"最大 {max(sizes, default=0) / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import argparse
+import json
+from array import array
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+from compact_graph import CompactGraph
+from content_store import replace_if_changed, update_manifest
+from extract_components import (
+    SIZE_BUCKETS, LARGE_MAX_SIZE, node_record, edge_record, component_id, subgraph_index_entry,
+    assign_subgraph_files, remove_stale_subgraphs, save_subgraph_index, load_subgraph_index, split_large_components
+)
+
+_WHITESPACE = ' \t\n\r'
+
+class _StreamReader:
+    """按块读取文本，配合 raw_decode 逐个解析 JSON 值"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符（文件结束时返回空串）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON 格式错误：期望 {char!r}，位置附近为 {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def decode(self):
+        """解析下一个完整的 JSON 值；缓冲区不足时继续读入"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # 数字可能恰好被块边界截断，读入更多数据后重新解析
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+def iter_top_level_arrays(graph_file, chunk_size=1 << 16):
+    """
+    流式解析形如 {"key": [元素, ...], ...} 的 JSON 文件，
+    按文件顺序逐个产出 (key, 元素)，内存占用与单个元素大小相当
+    """
+    with open(graph_file, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.decode()
+            reader.expect(':')
+            if reader.peek() == '[':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield key, reader.decode()
+                        if reader.peek() == ',':
+                            reader.pos += 1
+                            continue
+                        reader.expect(']')
+                        break
+            else:
+                reader.decode()
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            return
+
+def iter_graph_edges(graph_file='idiom_graph.json'):
+    """逐个产出边"""
+    for key, value in iter_top_level_arrays(graph_file):
+        if key == 'edges':
+            yield value
+
+def _indent_json(value, prefix='    '):
+    """与 json.dump(indent=2) 相同格式的嵌套元素"""
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return '\n'.join(prefix + line for line in text.split('\n'))
+
+class ComponentWriter:
+    """
+    增量写出 {"nodes": [...], "edges": [...]} 文件，格式与 json.dump(indent=2) 一致。
+    节点一次写入，边逐条追加；可随时挂起（关闭文件句柄）后再续写。
+    内容先写入临时文件，close() 时与已有文件比较哈希，未变化则不覆盖。
+    """
+
+    def __init__(self, output_file, node_records):
+        self.output_file = output_file
+        self.tmp_file = output_file + '.tmp'
+        self.n_nodes = len(node_records)
+        self.n_edges = 0
+        self.changed = None
+        self._f = open(self.tmp_file, 'w', encoding='utf-8')
+        if node_records:
+            nodes_text = '[\n' + ',\n'.join(_indent_json(r) for r in node_records) + '\n  ]'
+        else:
+            nodes_text = '[]'
+        self._f.write('{\n  "nodes": ' + nodes_text + ',\n  "edges": [')
+
+    def add_edge(self, record):
+        if self._f is None:
+            self._f = open(self.tmp_file, 'a', encoding='utf-8')
+        self._f.write((',\n' if self.n_edges else '\n') + _indent_json(record))
+        self.n_edges += 1
+
+    def suspend(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def close(self):
+        """结束写入；返回 manifest 条目"""
+        if self._f is None:
+            self._f = open(self.tmp_file, 'a', encoding='utf-8')
+        self._f.write(('\n  ]' if self.n_edges else ']') + '\n}')
+        self._f.close()
+        self._f = None
+        entry, self.changed = replace_if_changed(self.tmp_file, self.output_file, manifest_file=None)
+        return entry
+
+class _WriterPool:
+    """限制同时打开的文件句柄数（最近最少使用的写入器被挂起）"""
+
+    def __init__(self, max_open=256):
+        self.max_open = max_open
+        self.active = OrderedDict()
+
+    def touch(self, writer):
+        self.active[id(writer)] = writer
+        self.active.move_to_end(id(writer))
+        while len(self.active) > self.max_open:
+            _, evicted = self.active.popitem(last=False)
+            evicted.suspend()
+
+def _oversized_subgraph(graph_file, node_ids, labels, min_weight, max_size):
+    """
+    再次流式读取边，只保留两端都在超限分量内、权重达标的边，构建用于社区拆分的 CompactGraph；
+    边端点与权重存入 array（每条边 4 + 4 + 8 字节），不为每条边创建 Python 整数对象
+    """
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    oversized = np.bincount(labels, minlength=len(node_ids))[labels] > max_size
+    src, dst, weight = array('i'), array('i'), array('d')
+    for edge in iter_graph_edges(graph_file):
+        if edge.get('weight', 0) < min_weight:
+            continue
+        u, v = index[edge['source']], index[edge['target']]
+        if oversized[u] and oversized[v]:
+            src.append(u)
+            dst.append(v)
+            weight.append(edge.get('weight', 0))
+    return CompactGraph(node_ids, np.frombuffer(src, dtype=np.intc), np.frombuffer(dst, dtype=np.intc),
+                        np.frombuffer(weight, dtype=np.float64))
+
+def stream_extract_all(graph_file='idiom_graph.json', min_weight=3, min_size=10,
+                       buckets=None, output_prefix='large_subgraph_', max_size=None):
+    """
+    流式提取所有分组并直接写文件，不在内存中保留边列表：
+      第一遍：读入节点，边以生成器方式送入并查集；
+      第二遍：再次流式读取边，逐条写入所属分组的文件。
+    内存占用与节点数（及最终写出的边数，用于去重）成正比，而非输入边数。
+    大子图文件的命名与 save_large_subgraphs 相同：按分量 id 沿用编号，并删除过期文件。
+    max_size 不为 None 且存在超限分量时，中间多读一遍边，
+    只把超限分量内部的边载入内存，按与 extract_all_buckets 相同的方式拆分。
+    这部分额外内存约为每条分量内部边 16 字节（两端下标各 4 字节、权重 8 字节），
+    加上拆分时按权重过滤、去重产生的同量级临时数组，拆分完成后即释放。
+    """
+    if buckets is None:
+        buckets = SIZE_BUCKETS
+
+    # 第一遍：节点 + 并查集（根始终取较小下标，即分量内首个节点）
+    node_ids = []
+    nodes = []
+    index = {}
+    parent = []
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for key, value in iter_top_level_arrays(graph_file):
+        if key == 'nodes':
+            index[value['id']] = len(node_ids)
+            parent.append(len(node_ids))
+            node_ids.append(value['id'])
+            nodes.append(value)
+        elif key == 'edges':
+            if value.get('weight', 0) < min_weight or value['source'] == value['target']:
+                continue
+            root_u, root_v = find(index[value['source']]), find(index[value['target']])
+            if root_u != root_v:
+                parent[max(root_u, root_v)] = min(root_u, root_v)
+
+    labels = np.array([find(i) for i in range(len(node_ids))], dtype=np.int64)
+    from_split = np.zeros(len(node_ids), dtype=bool)
+    anchors = {}
+    if max_size is not None and (np.bincount(labels, minlength=len(node_ids)) > max_size).any():
+        graph = _oversized_subgraph(graph_file, node_ids, labels, min_weight, max_size)
+        split, from_split, anchors = split_large_components(graph, labels, min_weight, min_size, max_size)
+        # 载入的图只含超限分量内部的边，其余节点沿用第一遍的标号
+        labels = np.where(from_split, split, labels)
+        del graph
+    labels = labels.tolist()
+    members = {}
+    for i, root in enumerate(labels):
+        members.setdefault(root, []).append(i)
+    for root, anchor in anchors.items():
+        members[root] = sorted(members[root] + [anchor])
+
+    # 分量大小 -> 分组名
+    size_to_bucket = {}
+    for name, (lo, hi, _) in buckets.items():
+        for n in range(lo, hi + 1):
+            size_to_bucket[n] = name
+
+    bucket_members = {name: [] for name in buckets}
+    large_roots = []
+    for root in sorted(members):
+        comp = members[root]
+        if from_split[root] or len(comp) > min_size:
+            large_roots.append(root)
+        elif len(comp) in size_to_bucket:
+            bucket_members[size_to_bucket[len(comp)]].extend(comp)
+
+    # 打开各输出文件并写入节点
+    route = {}
+    writers = []
+    for name, (_, _, output_file) in buckets.items():
+        writer = ComponentWriter(output_file, [node_record(nodes[i]) for i in bucket_members[name]])
+        writers.append(writer)
+        for i in bucket_members[name]:
+            route[labels[i]] = writer
+    # 大子图文件名按分量 id 沿用上次索引中的编号
+    previous = load_subgraph_index()
+    output_files = assign_subgraph_files(
+        [component_id(node_ids[i] for i in members[root]) for root in large_roots], previous, output_prefix
+    )
+    large_writers = []
+    for root, output_file in zip(large_roots, output_files):
+        writer = ComponentWriter(output_file, [node_record(nodes[i]) for i in members[root]])
+        writer.suspend()
+        writers.append(writer)
+        large_writers.append((writer, [node_ids[i] for i in members[root]]))
+        route[root] = writer
+    del members, bucket_members
+    strength = defaultdict(int)  # 加权度，用于分量索引中的代表词语
+
+    # 第二遍：边逐条写入所属分组（去重）
+    pool = _WriterPool()
+    edge_set = set()
+    for edge in iter_graph_edges(graph_file):
+        if edge.get('weight', 0) < min_weight or edge['source'] == edge['target']:
+            continue
+        u, v = index[edge['source']], index[edge['target']]
+        if labels[u] == labels[v]:
+            owner = labels[u]
+        elif anchors.get(labels[v]) == u:
+            owner = labels[v]
+        elif anchors.get(labels[u]) == v:
+            owner = labels[u]
+        else:
+            continue
+        writer = route.get(owner)
+        if writer is None:
+            continue
+        sorted_pair = (u, v) if u < v else (v, u)
+        if sorted_pair not in edge_set:
+            pool.touch(writer)
+            writer.add_edge(edge_record(edge))
+            edge_set.add(sorted_pair)
+            strength[edge['source']] += edge.get('weight', 0)
+            strength[edge['target']] += edge.get('weight', 0)
+
+    entries = {}
+    for writer in writers:
+        entries.update(writer.close())
+        status = "结果已保存到" if writer.changed else "内容未变化，跳过"
+        print(f"{status} {writer.output_file}（{writer.n_nodes} 个节点, {writer.n_edges} 条边）")
+    update_manifest(entries)
+    remove_stale_subgraphs(previous, output_files, output_prefix)
+
+    subgraph_index = {}
+    for writer, member_ids in large_writers:
+        cid, entry = subgraph_index_entry(writer.output_file, member_ids, writer.n_edges, strength)
+        subgraph_index[cid] = entry
+    save_subgraph_index(subgraph_index)
+    return writers
+
+def main():
+    parser = argparse.ArgumentParser(description="流式读取超大图并输出所有分组文件")
+    parser.add_argument("--graph", default="idiom_graph.json")
+    parser.add_argument("--min-weight", type=int, default=3)
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=LARGE_MAX_SIZE,
+                        help="单个大子图的最大节点数，超过则按社区拆分")
+    args = parser.parse_args()
+
+    stream_extract_all(args.graph, min_weight=args.min_weight, min_size=args.min_size,
+                       max_size=args.max_size)
+
+if __name__ == "__main__":
+    main()
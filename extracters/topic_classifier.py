@@ -1,15 +1,29 @@
+import argparse
 import json
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans
-import jieba
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import re
 
+from embedding_cache import EmbeddingCache
+from keyword_matcher import KeywordMatcher
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
 class EightDimensionClassifier:
-    def __init__(self):
-        self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+    def __init__(self, keyword_only=False, workers=None):
+        """
+        keyword_only=True 时只做关键词打分，不加载语义模型、不做聚类（cluster_id 为 None）。
+        sentence_transformers / sklearn / jieba 均在首次用到时才导入，构造本身很快。
+        workers 为批量关键词分类的进程数（None 为 CPU 核数，1 为不使用进程池）
+        """
+        self.keyword_only = keyword_only
+        self.workers = workers
+        self._model = None
+        self._embedding_cache = None
         self.questions = {}
+        self._classification = None  # semantic_dimension_classification 的结果，load_data 后失效
         
         # 8个核心维度
         self.core_dimensions = {
@@ -54,75 +68,9 @@ class EightDimensionClassifier:
                 "sub_themes": ["宏观经济", "政策调控", "改革开放", "市场机制"]
             }
         }
-    
-    def load_data(self, file_path):
-        """加载数据"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            self.questions = json.load(f)
-        print(f"成功加载 {len(self.questions)} 个问题")
-    
-    def extract_dimension_keywords(self, text):
-        """提取维度关键词"""
-        words = jieba.cut(text)
-        found_keywords = []
-        
-        for word in words:
-            for dimension, info in self.core_dimensions.items():
-                if word in info['keywords'] and len(word) > 1:
-                    found_keywords.append((word, dimension))
-        
-        return found_keywords
-    
-    def calculate_dimension_scores(self, text):
-        """计算各维度得分"""
-        scores = {dimension: 0 for dimension in self.core_dimensions}
-        
-        # 关键词匹配得分
-        keywords = self.extract_dimension_keywords(text)
-        for word, dimension in keywords:
-            scores[dimension] += 1
-        
-        # 文本内容匹配得分
-        for dimension, info in self.core_dimensions.items():
-            for keyword in info['keywords']:
-                if keyword in text:
-                    scores[dimension] += 0.5
-        
-        return scores
-    
-    def predict_dimension(self, text, options_text=""):
-        """预测问题维度"""
-        combined_text = text + " " + options_text
-        scores = self.calculate_dimension_scores(combined_text)
-        
-        # 找到得分最高的维度
-        if scores:
-            max_score = max(scores.values())
-            if max_score > 0:
-                best_dimensions = [dim for dim, score in scores.items() if score == max_score]
-                best_dimension = best_dimensions[0]  # 取第一个
-                
-                # 确定子主题
-                sub_theme = self.predict_sub_theme(best_dimension, combined_text)
-                
-                return {
-                    'main_dimension': best_dimension,
-                    'sub_theme': sub_theme,
-                    'confidence': min(max_score / 5, 1.0),  # 标准化置信度
-                    'dimension_scores': scores
-                }
-        
-        return {
-            'main_dimension': '其他',
-            'sub_theme': '未分类',
-            'confidence': 0.0,
-            'dimension_scores': scores
-        }
-    
-    def predict_sub_theme(self, dimension, text):
-        """预测子主题"""
-        sub_themes = self.core_dimensions[dimension]['sub_themes']
-        theme_keywords_map = {
+
+        # 各维度子主题的关键词
+        self.sub_theme_keywords = {
             "个人修养": {
                 "道德品质": ["品德", "道德", "品质", "修养", "情操"],
                 "理想信念": ["理想", "信念", "信仰", "追求", "目标"],
@@ -172,13 +120,132 @@ class EightDimensionClassifier:
                 "市场机制": ["市场", "机制", "竞争", "供求", "价格"]
             }
         }
+
+        self.build_keyword_index()
+    
+    def build_keyword_index(self):
+        """关键词 -> 所属维度 / (维度, 子主题)，并把全部关键词编译为一个自动机；修改词表后需重新调用"""
+        self.keyword_dimensions = defaultdict(list)
+        for dimension, info in self.core_dimensions.items():
+            for keyword in info['keywords']:
+                self.keyword_dimensions[keyword].append(dimension)
+        self.keyword_themes = defaultdict(list)
+        for dimension, themes in self.sub_theme_keywords.items():
+            for theme, keywords in themes.items():
+                for keyword in keywords:
+                    self.keyword_themes[keyword].append((dimension, theme))
+        self.matcher = KeywordMatcher(list(self.keyword_dimensions) + list(self.keyword_themes))
+    
+    @property
+    def model(self):
+        """SentenceTransformer 模型，首次使用时才导入并加载（会引入 torch）"""
+        if self._model is None:
+            if self.keyword_only:
+                raise RuntimeError("关键词模式下不加载语义模型")
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(MODEL_NAME)
+        return self._model
+    
+    @property
+    def embedding_cache(self):
+        """嵌入缓存，首次使用时才打开"""
+        if self._embedding_cache is None:
+            self._embedding_cache = EmbeddingCache(MODEL_NAME)
+        return self._embedding_cache
+    
+    def load_data(self, file_path):
+        """加载数据"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            self.questions = json.load(f)
+        self._classification = None
+        print(f"成功加载 {len(self.questions)} 个问题")
+    
+    def tokenize(self, text):
+        """jieba 分词"""
+        import jieba  # 首次分词时 jieba 才加载词典
+        return jieba.lcut(text)
+    
+    def extract_dimension_keywords(self, text, tokens=None):
+        """提取维度关键词；已分好词时传入 tokens，不再重复分词"""
+        words = self.tokenize(text) if tokens is None else tokens
+        found_keywords = []
+        
+        for word in words:
+            if len(word) > 1:
+                for dimension in self.keyword_dimensions.get(word, ()):
+                    found_keywords.append((word, dimension))
+        
+        return found_keywords
+    
+    def match_keywords(self, text):
+        """
+        文本经自动机扫描一遍，同时得到维度与子主题的文本匹配得分：
+        出现的每个关键词为所属维度加 0.5、为所属子主题加 1
+        """
+        scores = {dimension: 0 for dimension in self.core_dimensions}
+        theme_scores = {dimension: {theme: 0 for theme in info['sub_themes']}
+                        for dimension, info in self.core_dimensions.items()}
+        for keyword in self.matcher.find_all(text):
+            for dimension in self.keyword_dimensions.get(keyword, ()):
+                scores[dimension] += 0.5
+            for dimension, theme in self.keyword_themes.get(keyword, ()):
+                theme_scores[dimension][theme] += 1
+        return scores, theme_scores
+    
+    def score_text(self, text, tokens=None):
+        """计算各维度得分，并附带各维度的子主题得分"""
+        # 文本内容匹配得分
+        scores, theme_scores = self.match_keywords(text)
+        
+        # 关键词匹配得分
+        keywords = self.extract_dimension_keywords(text, tokens)
+        for word, dimension in keywords:
+            scores[dimension] += 1
         
-        scores = {theme: 0 for theme in sub_themes}
-        for theme in sub_themes:
-            for keyword in theme_keywords_map[dimension][theme]:
-                if keyword in text:
-                    scores[theme] += 1
+        return scores, theme_scores
+    
+    def calculate_dimension_scores(self, text):
+        """计算各维度得分"""
+        scores, _ = self.score_text(text)
+        return scores
+    
+    def predict_dimension(self, text, options_text="", tokens=None):
+        """预测问题维度；tokens 为 text + " " + options_text 的分词结果（可选）"""
+        combined_text = text + " " + options_text
+        scores, theme_scores = self.score_text(combined_text, tokens)
         
+        # 找到得分最高的维度
+        if scores:
+            max_score = max(scores.values())
+            if max_score > 0:
+                best_dimensions = [dim for dim, score in scores.items() if score == max_score]
+                best_dimension = best_dimensions[0]  # 取第一个
+                
+                # 确定子主题
+                sub_theme = self.best_sub_theme(best_dimension, theme_scores[best_dimension])
+                
+                return {
+                    'main_dimension': best_dimension,
+                    'sub_theme': sub_theme,
+                    'confidence': min(max_score / 5, 1.0),  # 标准化置信度
+                    'dimension_scores': scores
+                }
+        
+        return {
+            'main_dimension': '其他',
+            'sub_theme': '未分类',
+            'confidence': 0.0,
+            'dimension_scores': scores
+        }
+    
+    def predict_sub_theme(self, dimension, text):
+        """预测子主题"""
+        _, theme_scores = self.match_keywords(text)
+        return self.best_sub_theme(dimension, theme_scores[dimension])
+    
+    def best_sub_theme(self, dimension, scores):
+        """得分最高的子主题（并列取靠前者，全为 0 时取第一个）"""
+        sub_themes = self.core_dimensions[dimension]['sub_themes']
         if scores:
             max_score = max(scores.values())
             if max_score > 0:
@@ -187,34 +254,75 @@ class EightDimensionClassifier:
         
         return sub_themes[0]  # 默认返回第一个子主题
     
+    def classify_question(self, data):
+        """
+        单题关键词分类，题干与选项各只分词一次：
+        jieba 以空白等非汉字字符分块切词，题干 + " " + 选项的分词结果就是两段分词的拼接，
+        题干的词同时用于提取关键词与维度打分
+        """
+        text = data['text']
+        options_text = ' '.join(data['options'])
+        text_tokens = self.tokenize(text)
+        combined_tokens = text_tokens + [" "] + self.tokenize(options_text)
+        
+        prediction = self.predict_dimension(text, options_text, tokens=combined_tokens)
+        prediction['keywords'] = list(dict.fromkeys(
+            kw for kw, dim in self.extract_dimension_keywords(text, text_tokens)
+        ))
+        return prediction
+    
+    def classify_questions(self, questions=None, workers=None, batch_size=2000):
+        """
+        批量关键词分类，返回 {题号: classify_question 的结果}（顺序同输入）。
+        题目多于一批且 workers != 1 时，按批分发到进程池，每个进程只加载一次词典；
+        子进程按本实例的维度与子主题词表重建分类器
+        """
+        items = list((self.questions if questions is None else questions).items())
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(items) <= batch_size:
+            return {qid: self.classify_question(data) for qid, data in items}
+        
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches)),
+                                 initializer=_init_classify_worker,
+                                 initargs=(self.core_dimensions, self.sub_theme_keywords)) as pool:
+            for batch_results in pool.map(_classify_batch, batches):
+                results.update(batch_results)
+        return results
+    
     def semantic_dimension_classification(self):
-        """语义维度分类"""
-        embeddings, question_ids = self.get_text_embeddings()
+        """语义维度分类（结果缓存在实例上，嵌入与聚类只计算一次，重新 load_data 后失效）"""
+        if self._classification is not None:
+            return self._classification
         
-        # 使用聚类辅助分类
-        n_clusters = min(30, len(question_ids) // 15)
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(embeddings)
+        # 使用聚类辅助分类（关键词模式下跳过）
+        if self.keyword_only:
+            question_ids = list(self.questions)
+            clusters = None
+        else:
+            from sklearn.cluster import KMeans
+            embeddings, question_ids = self.get_text_embeddings()
+            n_clusters = min(30, len(question_ids) // 15)
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+            clusters = kmeans.fit_predict(embeddings)
         
+        # 基于关键词的维度预测（批量、可多进程）
+        predictions = self.classify_questions(workers=self.workers)
         classification_results = {}
         
         for i, qid in enumerate(question_ids):
-            data = self.questions[qid]
-            text = data['text']
-            options_text = ' '.join(data['options'])
-            
-            # 基于关键词和语义的维度预测
-            dimension_prediction = self.predict_dimension(text, options_text)
-            
+            dimension_prediction = predictions[qid]
             classification_results[qid] = {
                 'main_dimension': dimension_prediction['main_dimension'],
                 'sub_theme': dimension_prediction['sub_theme'],
                 'confidence': dimension_prediction['confidence'],
-                'cluster_id': int(clusters[i]),
+                'cluster_id': None if clusters is None else int(clusters[i]),
                 'dimension_scores': dimension_prediction['dimension_scores'],
-                'keywords': list(set([kw for kw, dim in self.extract_dimension_keywords(text)]))
+                'keywords': dimension_prediction['keywords']
             }
         
+        self._classification = classification_results
         return classification_results
     
     def get_text_embeddings(self):
@@ -231,8 +339,11 @@ class EightDimensionClassifier:
             texts.append(combined_text)
             question_ids.append(qid)
         
+        # 只对缓存中没有的文本调用模型，新增或修改过的题目才需要重新编码
         print("正在生成文本嵌入...")
-        embeddings = self.model.encode(texts, show_progress_bar=True)
+        embeddings = self.embedding_cache.get_or_encode(
+            texts, lambda batch: self.model.encode(batch, show_progress_bar=True)
+        )
         return embeddings, question_ids
     
     def preprocess_text(self, text):
@@ -308,9 +419,17 @@ class EightDimensionClassifier:
             
             print()
     
-    def analyze_dimension_distribution(self):
-        """分析维度分布"""
-        results = self.semantic_dimension_classification()
+    def analyze_dimension_distribution(self, dimension_results=None):
+        """分析维度分布；传入 save_dimension_classification 的结果时直接统计，不再重新分类"""
+        if dimension_results is None:
+            results = self.semantic_dimension_classification()
+        else:
+            results = {
+                qid: question['classification_info']
+                for sub_themes in dimension_results.values()
+                for questions in sub_themes.values()
+                for qid, question in questions.items()
+            }
         
         dimension_counts = defaultdict(int)
         confidence_by_dimension = defaultdict(list)
@@ -329,16 +448,38 @@ class EightDimensionClassifier:
             avg_confidence = np.mean(confidence_by_dimension[dimension]) if confidence_by_dimension[dimension] else 0
             print(f"{dimension}: {count} 题 ({percentage:.1f}%) - 平均置信度: {avg_confidence:.3f}")
 
+# 进程池中的分类器：只做关键词分类，每个进程构造一次
+_worker_classifier = None
+
+def _init_classify_worker(core_dimensions, sub_theme_keywords):
+    global _worker_classifier
+    _worker_classifier = EightDimensionClassifier(keyword_only=True)
+    _worker_classifier.core_dimensions = core_dimensions
+    _worker_classifier.sub_theme_keywords = sub_theme_keywords
+    _worker_classifier.build_keyword_index()
+
+def _classify_batch(items):
+    return {qid: _worker_classifier.classify_question(data) for qid, data in items}
+
 # 使用示例
 def main():
-    classifier = EightDimensionClassifier()
-    classifier.load_data('merged_questions.json')
+    parser = argparse.ArgumentParser(description="8维度题目分类")
+    parser.add_argument("--questions", default="merged_questions.json")
+    parser.add_argument("--output", default="8dimension_classified.json")
+    parser.add_argument("--keyword-only", action="store_true",
+                        help="只用关键词打分，不加载语义模型、不做聚类")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="关键词分类的进程数，默认 CPU 核数；1 为单进程")
+    args = parser.parse_args()
+
+    classifier = EightDimensionClassifier(keyword_only=args.keyword_only, workers=args.workers)
+    classifier.load_data(args.questions)
     
     print("开始8维度分类...")
-    results = classifier.save_dimension_classification('8dimension_classified.json')
+    results = classifier.save_dimension_classification(args.output)
     
     print("\n📊 维度分布分析...")
-    classifier.analyze_dimension_distribution()
+    classifier.analyze_dimension_distribution(results)
     
     print("✅ 8维度分类完成！")
 
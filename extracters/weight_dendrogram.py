@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+from bisect import bisect_right
+
+import numpy as np
+
+from compact_graph import CompactGraph, connected_component_labels
+from extract_components import load_graph_data, extract_all_buckets, save_all, LARGE_MAX_SIZE
+
+def build_weight_dendrogram(graph):
+    """
+    按权重从高到低排序边，增量并查集合并（Kruskal 式），记录每次有效合并。
+    任意 min_weight 下的连通分量 = 权重 >= min_weight 的合并前缀。
+    """
+    parent = list(range(graph.num_nodes))
+    size = [1] * graph.num_nodes
+
+    def find_idx(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # 去掉自环后按权重降序（稳定排序）
+    edge_ids = np.flatnonzero(graph.src != graph.dst)
+    edge_ids = edge_ids[np.argsort(-graph.weight[edge_ids], kind='stable')]
+    weights = graph.weight[edge_ids].tolist()
+    srcs = graph.src[edge_ids].tolist()
+    dsts = graph.dst[edge_ids].tolist()
+
+    merges = []
+    levels = []
+    n_components = graph.num_nodes
+    largest = 1 if graph.num_nodes else 0
+    for i, (weight, u, v) in enumerate(zip(weights, srcs, dsts)):
+        root_u, root_v = find_idx(u), find_idx(v)
+        if root_u != root_v:
+            if size[root_u] < size[root_v]:
+                root_u, root_v = root_v, root_u
+            parent[root_v] = root_u
+            size[root_u] += size[root_v]
+            merges.append([weight, u, v])
+            n_components -= 1
+            largest = max(largest, size[root_u])
+
+        # 该权重的最后一条边：记录此阈值下的分量结构
+        if i + 1 == len(weights) or weights[i + 1] != weight:
+            levels.append({
+                "min_weight": weight,
+                "merges": len(merges),
+                "components": n_components,
+                "largest": largest
+            })
+
+    return {"nodes": graph.node_ids, "merges": merges, "levels": levels}
+
+def merge_prefix_length(dendrogram, min_weight):
+    """权重 >= min_weight 的合并数量（合并按权重降序排列）"""
+    # levels 按 min_weight 降序，取反后二分
+    thresholds = [-level["min_weight"] for level in dendrogram["levels"]]
+    pos = bisect_right(thresholds, -min_weight)
+    return dendrogram["levels"][pos - 1]["merges"] if pos else 0
+
+def components_from_dendrogram(dendrogram, min_weight):
+    """
+    由合并前缀直接还原 min_weight 下的连通分量标号，无需重新扫描边。
+    返回值与 CompactGraph.component_labels 相同。
+    """
+    prefix = dendrogram["merges"][:merge_prefix_length(dendrogram, min_weight)]
+    merges = np.array(prefix, dtype=np.int64).reshape(-1, 3)
+    return connected_component_labels(len(dendrogram["nodes"]), merges[:, 1], merges[:, 2])
+
+def save_dendrogram(dendrogram, output_file='idiom_dendrogram.json'):
+    """保存合并树"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(dendrogram, f, ensure_ascii=False)
+    print(f"合并树已保存到 {output_file}")
+
+def load_dendrogram(dendrogram_file='idiom_dendrogram.json', graph_file='idiom_graph.json'):
+    """加载合并树；若文件不存在或比图数据旧则返回 None"""
+    if not os.path.exists(dendrogram_file):
+        return None
+    if os.path.exists(graph_file) and os.path.getmtime(dendrogram_file) < os.path.getmtime(graph_file):
+        return None
+    with open(dendrogram_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def print_sweep(dendrogram):
+    """打印每个阈值下的连通分量概况"""
+    print(f"{'min_weight':>10} {'合并数':>8} {'分量数':>8} {'最大分量':>8}")
+    for level in dendrogram["levels"]:
+        print(f"{level['min_weight']:>10} {level['merges']:>8} "
+              f"{level['components']:>8} {level['largest']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="按权重阈值扫描连通分量（Kruskal 式合并树）")
+    parser.add_argument("--min-weight", type=int, default=None,
+                        help="若指定，则直接用合并树还原该阈值下的分量并输出所有分组文件")
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=LARGE_MAX_SIZE,
+                        help="单个大子图的最大节点数，超过则按社区拆分")
+    args = parser.parse_args()
+
+    # 加载数据
+    nodes, edges = load_graph_data()
+    graph = CompactGraph.from_json(nodes, edges)
+
+    # 优先复用已保存的合并树，否则一次排序 + 增量合并重新构建
+    dendrogram = load_dendrogram()
+    if dendrogram is None:
+        dendrogram = build_weight_dendrogram(graph)
+        save_dendrogram(dendrogram)
+    print_sweep(dendrogram)
+
+    # 指定阈值：跳过并查集，直接按合并前缀输出
+    if args.min_weight is not None:
+        bucket_results, large_subgraphs = extract_all_buckets(
+            nodes, edges, min_weight=args.min_weight, min_size=args.min_size,
+            labels=components_from_dendrogram(dendrogram, args.min_weight), graph=graph,
+            max_size=args.max_size
+        )
+        save_all(bucket_results, large_subgraphs)
+
+if __name__ == "__main__":
+    main()
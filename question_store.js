@@ -0,0 +1,91 @@
+// 分片题库加载器：只拉取所需题目所在的分片（分片由 extracters/shard_questions.py 生成）
+class QuestionStore {
+    constructor(baseUrl = 'question_shards/') {
+        this.baseUrl = baseUrl;
+        this.index = null;
+        this.shards = new Map();   // 分片号 -> Promise<{题号: 题目}>
+        this.observer = null;
+        this.pending = new Map();  // 等待进入视口的元素 -> 回调
+    }
+
+    loadIndex() {
+        if (!this.index) {
+            this.index = fetch(this.baseUrl + 'index.json').then(r => {
+                if (!r.ok) throw new Error(`题库索引加载失败：${r.status}`);
+                return r.json();
+            });
+        }
+        return this.index;
+    }
+
+    // FNV-1a 32 位哈希（UTF-8 字节），与 shard_questions.py 中的 string_hash 一致
+    static stringHash(text) {
+        let h = 0x811c9dc5;
+        for (const byte of new TextEncoder().encode(text)) {
+            h = Math.imul(h ^ byte, 0x01000193) >>> 0;
+        }
+        return h;
+    }
+
+    shardKey(index, id) {
+        if (index.scheme === 'range') {
+            return Math.floor(Number(id) / index.shard_size);
+        }
+        return QuestionStore.stringHash(String(id)) % index.shard_count;
+    }
+
+    loadShard(index, key) {
+        if (!this.shards.has(key)) {
+            const file = index.shards[key];
+            this.shards.set(key, file
+                ? fetch(this.baseUrl + file).then(r => {
+                    if (!r.ok) throw new Error(`题库分片加载失败：${r.status}`);
+                    return r.json();
+                })
+                : Promise.resolve({}));
+        }
+        return this.shards.get(key);
+    }
+
+    // 按题号取题目，返回与 ids 一一对应的数组（题库中不存在的为 undefined）
+    async get(ids) {
+        const index = await this.loadIndex();
+        const keys = [...new Set(ids.map(id => this.shardKey(index, id)))];
+        const loaded = await Promise.all(keys.map(key => this.loadShard(index, key)));
+        const byKey = new Map(keys.map((key, i) => [key, loaded[i]]));
+        return ids.map(id => byKey.get(this.shardKey(index, id))[String(id)]);
+    }
+
+    // 页面重新渲染（如切换筛选）前调用：停止观察尚未加载、即将被替换的旧元素
+    reset() {
+        if (this.observer) {
+            this.pending.forEach((_, element) => this.observer.unobserve(element));
+        }
+        this.pending.clear();
+    }
+
+    // 元素进入视口（或即将进入）时再加载题目并交给 render 渲染
+    whenVisible(element, ids, render) {
+        const load = () => this.get(ids).then(render).catch(error => {
+            element.innerHTML = `<p style="color:red">题目加载失败: ${error}</p>`;
+        });
+        if (!('IntersectionObserver' in window)) {
+            load();
+            return;
+        }
+        if (!this.observer) {
+            this.observer = new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting && this.pending.has(entry.target)) {
+                        const callback = this.pending.get(entry.target);
+                        this.pending.delete(entry.target);
+                        this.observer.unobserve(entry.target);
+                        callback();
+                    }
+                });
+            }, { rootMargin: '200px' });
+        }
+        this.pending.set(element, load);
+        this.observer.observe(element);
+    }
+}